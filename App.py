@@ -16,11 +16,12 @@ from pygame.locals import (
     K_ESCAPE,
     QUIT
 )
-from snakes.Snake import Snake
+from snakes.Player_snake import Player_snake
 from snakes.Simple_ai_snake import Simple_ai_snake
 from snakes.A_star_snake import A_star_snake
 from snakes.Neat_snake import Neat_snake
-from Neat_app import replay_genome
+from Neat_app import replay
+from Renderer import Board_view, Score_board, path_shades
 
 # Define global constants
 CELL = 20
@@ -58,6 +59,10 @@ class App:
             self.frame_rate = 7
         self.font = pygame.font.SysFont(None, 36)
         self.high_score = self.get_high_score()
+        self.board = Board_view(self.screen, WIDTH, HEIGHT, CELL, MARGIN)
+        self.score_board = Score_board(self.screen, self.font, [
+            0, (MARGIN + CELL) * HEIGHT + MARGIN,
+            (MARGIN + CELL) * WIDTH + MARGIN, SCORE_BOARD])
 
         # Setup a clock for framerate
         self.clock = pygame.time.Clock()
@@ -80,6 +85,10 @@ class App:
         if self.check_lose_conditions():
             return
         self.snake.check_food_eaten()
+        # The snake filled the board so there is no food left to chase
+        if self.snake.won:
+            self.running = False
+            return
 
         # Move the snake for AI
         if isinstance(self.snake, Simple_ai_snake):
@@ -94,57 +103,18 @@ class App:
         self.clock.tick(self.frame_rate)
 
     def on_render(self):
-        """Render the screen each game loop."""
-        # Draw a black background
-        self.screen.fill(BLACK)
-
-        # Draw the path to the food if requested as decreasing shades of purple
-        if isinstance(self.snake, A_star_snake):
-            if self.snake.render_path:
-                count = 0
-                for coord in self.snake.path[::-1]:
-                    count += 1
-                    # Shade each cell of the path based on the cell's distance in
-                    # the path
-                    shade = tuple(
-                        x - 4 * count if x > 4 * count else 0 for x in PURPLE)
-                    self.render_cell(shade, coord)
-
-        # Draw the food
-        self.render_cell(RED, self.snake.food)
-
-        # Draw the snake
-        for coord in self.snake.body:
-            self.render_cell(GREEN, coord)
-
-        # Draw the head of the snake
-        self.render_cell(DARK_GREEN, self.snake.body[0])
-
-        # Draw the scoreboard
-        pygame.draw.rect(self.screen, GREY,
-                         [0,
-                          (MARGIN + CELL) * HEIGHT + MARGIN,
-                          (MARGIN + CELL) * WIDTH + MARGIN,
-                          SCORE_BOARD
-                          ])
-
-        current_score = self.font.render(
-            f"Score: {self.snake.score}", True, BLACK)
-        if self.snake.score < self.high_score:
-            high_score = self.font.render(
-                f"High Score: {self.high_score}", True, BLACK)
-        else:
-            high_score = self.font.render(
-                f"High Score: {self.snake.score}", True, BLACK)
-        self.screen.blit(current_score, (5, (MARGIN + CELL)
-                                         * HEIGHT + MARGIN + 5))
+        """Render the screen each game loop, drawing only what changed."""
+        # Shade the path to the food if requested
+        overlay = None
+        if isinstance(self.snake, A_star_snake) and self.snake.render_path:
+            overlay = path_shades(self.snake.path)
 
-        self.screen.blit(high_score, (((MARGIN + CELL) * WIDTH +
-                                       MARGIN) // 2, (MARGIN + CELL) *
-                                      HEIGHT + MARGIN + 5))
+        rects = self.board.draw(self.snake, overlay)
+        rects += self.score_board.draw(
+            self.snake.score, max(self.snake.score, self.high_score))
 
-        # Display the screen
-        pygame.display.flip()
+        # Display only the parts of the screen drawn on
+        pygame.display.update(rects)
 
     def on_cleanup(self):
         """Exit the game."""
@@ -184,31 +154,12 @@ class App:
 
     def check_lose_conditions(self):
         """See if the game is over."""
-        head = self.snake.body[0]
-
-        # Check if snake is out of bounds
-        if head[0] < 0 or head[0] == WIDTH:
-            self.running = False
-            return True
-        elif head[1] < 0 or head[1] == HEIGHT:
-            self.running = False
-            return True
-        # Check if snake hits itself
-        elif head in self.snake.body[1:]:
+        if self.snake.check_lose_conditions():
             self.running = False
             return True
 
         return False
 
-    def render_cell(self, color, coord):
-        """Render a single cell of the game board."""
-        pygame.draw.rect(self.screen, color,
-                         [(MARGIN + CELL) * coord[0] + MARGIN,
-                             (MARGIN + CELL) * coord[1] + MARGIN,
-                             CELL,
-                             CELL
-                          ])
-
 
 if __name__ == "__main__":
     error_message = '''Please indicate which type of game to play by typing\
@@ -222,7 +173,7 @@ if __name__ == "__main__":
         game = None
         ai_type = sys.argv[1]
         if ai_type in ['play', 'Play']:
-            game = App(Snake(WIDTH, HEIGHT))
+            game = App(Player_snake(WIDTH, HEIGHT))
             print()
             print('Press ESC key to exit.')
             print('Press any arrow key to start the game.')
@@ -240,10 +191,10 @@ if __name__ == "__main__":
             print('Press ESC key to exit.')
             print('Press the space bar to turn off/on snake vision.')
             print()
-            genome_path = 'pickled_snakes/neat_snake_4.pickle'
+            snake_path = 'exported_snakes/neat_snake_4.snet'
             local_dir = os.path.dirname(__file__)
             config_path = os.path.join(local_dir, "config-feedforward.txt")
-            replay_genome(config_path, genome_path)
+            replay(config_path, snake_path)
         else:
             raise ValueError(error_message)
 
@@ -0,0 +1,249 @@
+#!/usr/bin/env python3
+
+"""Benchmark every snake and the training loop without a window.
+
+Results are written as JSON so runs from different commits can be diffed.
+"""
+
+import sys
+import os
+import glob
+import json
+import time
+import random
+import pickle
+import argparse
+import platform
+import tracemalloc
+from time import perf_counter
+# Only the NEAT snakes and the training benchmark need neat
+try:
+    import neat
+except ImportError:
+    neat = None
+from snakes.Snake import Snake
+from snakes.Simple_ai_snake import Simple_ai_snake
+from snakes.A_star_snake import A_star_snake
+from snakes.Neat_snake import Neat_snake
+from snakes.Game import (Game, Neat_game, ai_policy, network_policy,
+                         player_policy, lay_body)
+from training.Profiler import Profiler
+from inference.Server import percentiles
+
+LOCAL_DIR = os.path.dirname(os.path.abspath(__file__))
+CONFIG_PATH = os.path.join(LOCAL_DIR, "config-feedforward.txt")
+
+
+def timed(policy, latencies):
+    """Wrap a policy to record how long each of its decisions takes."""
+    def run(snake):
+        start = perf_counter()
+        policy(snake)
+        latencies.append(perf_counter() - start)
+    return run
+
+
+def make_game(snake, policy, **kwargs):
+    """Set up a game of a snake, starving NEAT snakes the way training does."""
+    if isinstance(snake, Neat_snake):
+        return Neat_game(snake, policy, **kwargs)
+    return Game(snake, policy, **kwargs)
+
+
+def make_players(config_path):
+    """
+    List the snakes to benchmark by name, each with a function that sets up
+    a snake and its policy for a board size and random stream.
+    """
+    players = [
+        ("snake", lambda w, h, rng: (Snake(w, h, rng),
+                                     player_policy(random.Random(rng.random())))),
+        ("simple", lambda w, h, rng: (Simple_ai_snake(w, h, rng), ai_policy)),
+        ("a_star", lambda w, h, rng: (A_star_snake(w, h, rng), ai_policy)),
+        ("a_star_reuse", lambda w, h, rng: (
+            A_star_snake(w, h, rng, reuse_path=True), ai_policy)),
+    ]
+
+    if neat is None:
+        return players
+
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                                config_path)
+    for genome_path in sorted(glob.glob(os.path.join(LOCAL_DIR, "pickled_snakes",
+                                                     "*.pickle"))):
+        with open(genome_path, "rb") as f:
+            genome = pickle.load(f)
+        net = neat.nn.feed_forward.FeedForwardNetwork.create(genome, config)
+        name = os.path.splitext(os.path.basename(genome_path))[0]
+        players.append((name, lambda w, h, rng, net=net: (
+            Neat_snake(w, h, rng), network_policy(net))))
+
+    return players
+
+
+def bench_games(name, make, width, height, length, games, max_steps, seed,
+                profile=False):
+    """Play seeded games with one snake and time them."""
+    latencies = []
+    scores = []
+    steps = 0
+    profiler = Profiler() if profile else None
+
+    start = perf_counter()
+    for game in range(games):
+        rng = random.Random(f"{seed}:{name}:{width}x{height}:{length}:{game}")
+        snake, policy = make(width, height, rng)
+        lay_body(snake, length)
+        game = make_game(snake, timed(policy, latencies),
+                         max_steps=max_steps, profiler=profiler)
+        scores.append(game.run())
+        steps += game.steps
+    seconds = perf_counter() - start
+
+    # Measure memory on one more game, tracing slows everything down
+    tracemalloc.start()
+    snake, policy = make(width, height, random.Random(f"{seed}:{name}:memory"))
+    lay_body(snake, length)
+    make_game(snake, policy, max_steps=max_steps).run()
+    peak_memory = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    result = {
+        "policy": name,
+        "width": width,
+        "height": height,
+        "length": length,
+        "games": games,
+        "steps": steps,
+        "seconds": seconds,
+        "steps_per_second": steps / seconds if seconds else None,
+        "games_per_second": games / seconds if seconds else None,
+        "mean_score": sum(scores) / len(scores),
+        "decision_latency_us": {key: value * 1e6 for key, value
+                                in percentiles(latencies).items()},
+        "peak_memory_bytes": peak_memory
+    }
+    if profiler is not None:
+        result["profile"] = profiler.summary()
+
+    return result
+
+
+def bench_training(config_path, generations, seed, vectorized, width, height,
+                   profile=False):
+    """Train headless for a few generations and time them."""
+    from training.Evaluator import Run_seed, make_engine
+    from training.Profile_reporter import Profile_reporter
+
+    profiler = Profiler() if profile else None
+    run_seed = Run_seed(seed)
+
+    def eval_genomes(genomes, config):
+        engine = make_engine(genomes, config, width, height,
+                             seeds=run_seed.game_seeds(genomes),
+                             vectorized=vectorized, profiler=profiler)
+        for (_, g), fitness in zip(genomes, engine.run()):
+            g.fitness = fitness
+
+    # neat draws its mutations from the global random stream
+    random.seed(seed)
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                                config_path)
+    p = neat.population.Population(config)
+    p.add_reporter(run_seed)
+    if profiler is not None:
+        reporter = Profile_reporter(profiler, show=False)
+        p.add_reporter(reporter)
+
+    start = perf_counter()
+    p.run(eval_genomes, generations)
+    seconds = perf_counter() - start
+
+    result = {
+        "engine": "vectorized" if vectorized else "sequential",
+        "width": width,
+        "height": height,
+        "population": config.pop_size,
+        "generations": p.generation,
+        "seconds": seconds,
+        "generations_per_hour": p.generation / seconds * 3600 if seconds else None
+    }
+    if profiler is not None:
+        result["profile"] = reporter.history
+
+    return result
+
+
+def parse_sizes(text):
+    """Read board sizes written like 20x20,50x35."""
+    return [tuple(int(x) for x in size.split("x")) for size in text.split(",")]
+
+
+def run(args):
+    results = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "seed": args.seed,
+        "games": [],
+        "training": []
+    }
+
+    players = make_players(args.config)
+    if args.policies:
+        players = [player for player in players if player[0] in args.policies]
+
+    for width, height in parse_sizes(args.sizes):
+        for length in [int(x) for x in args.lengths.split(",")]:
+            # Leave room on the board to play
+            if length > width * height // 2:
+                continue
+            for name, make in players:
+                print(f"{name} {width}x{height} length {length}", file=sys.stderr)
+                results["games"].append(bench_games(
+                    name, make, width, height, length, args.games,
+                    args.max_steps, args.seed, profile=args.profile))
+
+    if args.generations and neat is not None:
+        width, height = parse_sizes(args.sizes)[-1]
+        for vectorized in (False, True):
+            print(f"training {'vectorized' if vectorized else 'sequential'}",
+                  file=sys.stderr)
+            results["training"].append(bench_training(
+                args.config, args.generations, args.seed, vectorized,
+                width, height, profile=args.profile))
+
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the snakes.")
+    parser.add_argument("--sizes", default="20x20,50x35",
+                        help="board sizes to play on, like 20x20,50x35")
+    parser.add_argument("--lengths", default="1,50,200",
+                        help="lengths the snakes start at")
+    parser.add_argument("--games", type=int, default=5,
+                        help="games per snake, size and length")
+    parser.add_argument("--max-steps", type=int, default=2000,
+                        help="cut games off after this many moves")
+    parser.add_argument("--policies", nargs="*",
+                        help="only benchmark these snakes, like a_star neat_snake_4")
+    parser.add_argument("--generations", type=int, default=3,
+                        help="generations to train for the training benchmark, "
+                        "0 to skip it")
+    parser.add_argument("--profile", action="store_true",
+                        help="add the time spent in each phase to the results")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--config", default=CONFIG_PATH)
+    parser.add_argument("--output", help="write the JSON here instead of stdout")
+    args = parser.parse_args()
+
+    results = run(args)
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+    else:
+        json.dump(results, sys.stdout, indent=2)
+        print()
@@ -0,0 +1,47 @@
+#!/usr/bin/env python3
+
+"""Export pickled NEAT genomes as compiled network files.
+
+Network files load in milliseconds and play without neat-python, see
+snakes/Network_file.py.
+"""
+
+import os
+import sys
+import pickle
+import argparse
+import neat
+
+from snakes.Compiled_network import Compiled_network
+from snakes.Network_file import NETWORK_SUFFIX, save_network
+
+
+def export_genome(genome, config, path):
+    """Compile a genome and save it as a network file."""
+    save_network(Compiled_network.create(genome, config), path)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Export pickled NEAT genomes as network files.")
+    parser.add_argument("genomes", nargs="+",
+                        help="pickled genome files to export")
+    parser.add_argument("--out-dir", default="exported_snakes",
+                        help="directory to write the network files to")
+    args = parser.parse_args()
+
+    local_dir = os.path.dirname(__file__)
+    config_path = os.path.join(local_dir, "config-feedforward.txt")
+    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
+                                neat.DefaultSpeciesSet, neat.DefaultStagnation,
+                                config_path)
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for genome_path in args.genomes:
+        with open(genome_path, "rb") as f:
+            genome = pickle.load(f)
+
+        name = os.path.splitext(os.path.basename(genome_path))[0]
+        path = os.path.join(args.out_dir, name + NETWORK_SUFFIX)
+        export_genome(genome, config, path)
+        print(f"{genome_path} -> {path}", file=sys.stderr)
@@ -0,0 +1,291 @@
+#!/usr/bin/env python3
+
+"""Host thousands of headless games at once on one asyncio scheduler.
+
+Each game ticks at its own rate. Instead of every game sleeping on its
+own, one scheduler keeps the games in a heap by when they next tick and
+sleeps until the soonest. Neat snakes sharing a network are moved in one
+batched call, and expensive policies like A* can be handed to a thread or
+process pool so they don't hold up the other games.
+
+    ./Game_host.py --mix player:400,simple:300,a_star:100,neat:200 \\
+        --tick-rate 20 --duration 10 --offload process
+"""
+
+import os
+import json
+import asyncio
+import argparse
+from collections import deque
+from heapq import heappush, heappop
+from itertools import count
+from random import Random
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor
+
+from snakes.Snake import Snake
+from snakes.Simple_ai_snake import Simple_ai_snake
+from snakes.A_star_snake import A_star_snake
+from snakes.Game import Game, ai_policy, player_policy
+from inference.Policy import Policy, new_game
+from inference.Server import Planner_brain, game_state, percentiles
+
+LOCAL_DIR = os.path.dirname(os.path.abspath(__file__))
+NETWORK_PATH = os.path.join(LOCAL_DIR, "exported_snakes", "neat_snake_4.snet")
+
+# Each worker process plans on snakes of its own
+planner = None
+
+
+def plan_a_star(state):
+    """Plan an A* move for a game state in a worker process."""
+    global planner
+    if planner is None:
+        planner = Planner_brain()
+    return planner.decide([{"state": state}])[0]["direction"]
+
+
+class Hosted_game:
+    """
+    A class to house a game on the host: how often it ticks, whether its
+    policy is offloaded, and the Policy to batch its moves with, if any.
+    """
+
+    def __init__(self, game, tick_rate=None, offload=None, batch_policy=None):
+        self.game = game
+        self.period = 1 / tick_rate if tick_rate else 0
+        self.offload = offload
+        self.batch_policy = batch_policy
+        self.ticks = 0
+
+
+class Game_host:
+    """
+    A class to house the scheduler. Offloaded games run their policy in a
+    thread, or with offload set to "process" send their state to a process
+    that plans the move, and tick again once the move comes back.
+    """
+
+    def __init__(self, threads=None, processes=None, window=100000):
+        self.games = []
+        self.queue = []
+        self.order = count()
+        self.busy = 0
+        self.thread_pool = ThreadPoolExecutor(max_workers=threads)
+        self.process_pool = None
+        if processes:
+            self.process_pool = ProcessPoolExecutor(max_workers=processes)
+
+        self.ticks = 0
+        self.late_ticks = 0
+        # Only the latest lags count towards the percentiles
+        self.lags = deque(maxlen=window)
+        self.finished = []
+        self.wakeup = None
+
+    def add(self, game, tick_rate=None, offload=None, batch_policy=None):
+        """Host a game, ticking tick_rate times a second or flat out."""
+        hosted = Hosted_game(game, tick_rate, offload, batch_policy)
+        self.games.append(hosted)
+        return hosted
+
+    def schedule(self, hosted, when):
+        """Queue a game's next tick, or retire it if its game is over."""
+        if hosted.game.running:
+            heappush(self.queue, (when, next(self.order), hosted))
+        else:
+            self.finished.append(hosted)
+
+        if self.wakeup is not None:
+            self.wakeup.set()
+
+    def next_tick(self, hosted, due, now):
+        """When a game ticks next. Games too far behind skip the ticks missed."""
+        when = due + hosted.period
+        if when < now - hosted.period:
+            when = now
+        return when
+
+    async def offload(self, hosted, due):
+        """Decide a game's move off the event loop, then finish its tick."""
+        loop = asyncio.get_running_loop()
+        game = hosted.game
+        try:
+            if hosted.offload == "process" and self.process_pool is not None:
+                game.snake.direction = tuple(await loop.run_in_executor(
+                    self.process_pool, plan_a_star, game_state(game.snake)))
+            else:
+                await loop.run_in_executor(self.thread_pool, game.policy,
+                                           game.snake)
+            game.end_step()
+            hosted.ticks += 1
+            self.ticks += 1
+        finally:
+            self.busy -= 1
+        self.schedule(hosted, self.next_tick(hosted, due, loop.time()))
+
+    def tick_due(self, now):
+        """Tick every game that is due."""
+        # Games that tick flat out are due again at once, so take the due
+        # games off first to give every game a turn
+        due_games = []
+        while self.queue and self.queue[0][0] <= now:
+            due_games.append(heappop(self.queue))
+
+        batches = {}
+        for due, _, hosted in due_games:
+            lag = now - due
+            self.lags.append(lag)
+            if hosted.period and lag > hosted.period:
+                self.late_ticks += 1
+
+            game = hosted.game
+            if not game.begin_step():
+                self.finished.append(hosted)
+                continue
+
+            if hosted.offload:
+                self.busy += 1
+                asyncio.create_task(self.offload(hosted, due))
+            elif hosted.batch_policy is not None:
+                batches.setdefault(id(hosted.batch_policy), []).append(
+                    (hosted, due))
+            else:
+                game.policy(game.snake)
+                self.end_tick(hosted, due, now)
+
+        # Neat snakes on the same network move together
+        for entries in batches.values():
+            entries[0][0].batch_policy.move_batch(
+                [hosted.game.snake for hosted, _ in entries])
+            for hosted, due in entries:
+                self.end_tick(hosted, due, now)
+
+    def end_tick(self, hosted, due, now):
+        hosted.game.end_step()
+        hosted.ticks += 1
+        self.ticks += 1
+        self.schedule(hosted, self.next_tick(hosted, due, now))
+
+    async def run(self, duration=None):
+        """
+        Run the games until they are all over, or for duration seconds.
+        Returns the host's stats.
+        """
+        loop = asyncio.get_running_loop()
+        self.wakeup = asyncio.Event()
+        start = loop.time()
+        # Spread the first ticks over a period so the games don't all
+        # come due together
+        for x, hosted in enumerate(self.games):
+            self.schedule(hosted, start + hosted.period * x / len(self.games))
+
+        while True:
+            now = loop.time()
+            if duration is not None and now - start >= duration:
+                break
+            self.tick_due(now)
+            if not self.queue and not self.busy:
+                break
+
+            # Sleep until the next game is due or an offloaded move is back
+            self.wakeup.clear()
+            timeout = None
+            if self.queue:
+                timeout = max(0, self.queue[0][0] - loop.time())
+            if duration is not None:
+                remaining = max(0, start + duration - loop.time())
+                timeout = remaining if timeout is None else min(timeout,
+                                                                remaining)
+            if timeout == 0:
+                await asyncio.sleep(0)
+                continue
+            try:
+                await asyncio.wait_for(self.wakeup.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+
+        return self.stats(loop.time() - start)
+
+    def stats(self, seconds):
+        """How many ticks the games got through and how late they were."""
+        return {
+            "games": len(self.games),
+            "finished": len(self.finished),
+            "seconds": seconds,
+            "ticks": self.ticks,
+            "ticks_per_second": self.ticks / seconds if seconds else None,
+            "late_ticks": self.late_ticks,
+            "lag_ms": {key: value * 1e3 for key, value
+                       in percentiles(self.lags).items()},
+            "mean_score": (sum(hosted.game.snake.score for hosted in self.games)
+                           / len(self.games) if self.games else 0)
+        }
+
+    def close(self):
+        """Shut down the pools."""
+        self.thread_pool.shutdown()
+        if self.process_pool is not None:
+            self.process_pool.shutdown()
+
+
+def add_games(host, kind, number, width, height, tick_rate, offload, seed,
+              network_policy=None, max_steps=None):
+    """Host a number of games of one kind of snake."""
+    for x in range(number):
+        rng = Random(f"{seed}:{kind}:{x}")
+        if kind == "player":
+            game = Game(Snake(width, height, rng),
+                        player_policy(Random(rng.random())), max_steps)
+            host.add(game, tick_rate)
+        elif kind == "simple":
+            host.add(Game(Simple_ai_snake(width, height, rng), ai_policy,
+                          max_steps), tick_rate)
+        elif kind == "a_star":
+            host.add(Game(A_star_snake(width, height, rng), ai_policy,
+                          max_steps), tick_rate, offload=offload)
+        elif kind == "neat":
+            game = new_game(network_policy, width, height, seed=rng.random(),
+                            max_steps=max_steps)
+            host.add(game, tick_rate, batch_policy=network_policy)
+        else:
+            raise ValueError(f"Unknown kind of snake {kind!r}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Host headless games.")
+    parser.add_argument("--mix", default="player:400,simple:300,a_star:100,neat:200",
+                        help="kinds of snake and how many games of each")
+    parser.add_argument("--tick-rate", type=float, default=20,
+                        help="moves a second in each game, 0 for flat out")
+    parser.add_argument("--duration", type=float, default=10,
+                        help="seconds to run for")
+    parser.add_argument("--offload", choices=["thread", "process", "none"],
+                        default="thread",
+                        help="where A* snakes plan their moves")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="threads or processes to plan in")
+    parser.add_argument("--width", type=int, default=50)
+    parser.add_argument("--height", type=int, default=35)
+    parser.add_argument("--network", default=NETWORK_PATH,
+                        help="exported network the neat snakes play with")
+    parser.add_argument("--max-steps", type=int, default=None,
+                        help="end each game after this many moves")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    offload = None if args.offload == "none" else args.offload
+    host = Game_host(threads=args.workers,
+                     processes=args.workers or os.cpu_count()
+                     if offload == "process" else None)
+    network_policy = Policy.load(args.network)
+    for entry in args.mix.split(","):
+        kind, number = entry.split(":")
+        add_games(host, kind, int(number), args.width, args.height,
+                  args.tick_rate, offload, args.seed, network_policy,
+                  args.max_steps)
+
+    try:
+        stats = asyncio.run(host.run(args.duration))
+    finally:
+        host.close()
+    print(json.dumps(stats, indent=2))
@@ -6,8 +6,13 @@
 import sys
 import os
 from random import randint
-import neat
+from heapq import nlargest
 import pickle
+# Only pickled genomes need neat, network files play without it
+try:
+    import neat
+except ImportError:
+    neat = None
 import pygame
 from pygame.locals import (
     KEYDOWN,
@@ -20,6 +25,8 @@ from pygame.locals import (
     QUIT
 )
 from snakes.Neat_snake import Neat_snake
+from snakes.Network_file import NETWORK_SUFFIX, load_network
+from Renderer import Panel_layout
 
 # Define global constants
 CELL = 20
@@ -42,7 +49,7 @@ PURPLE = (147, 132, 240)
 class Training_app:
     """Class to house the game."""
 
-    def __init__(self, genomes, config, frame_rate=0):
+    def __init__(self, nets, frame_rate=0):
         pygame.init()
         self.running = True
         self.render_vision = False
@@ -50,22 +57,16 @@ class Training_app:
             SCREEN_WIDTH, SCREEN_HEIGHT
         ))
 
-        self.config = config
-
-        self.den = []
-        self.nets = []
-        self.ge = []
-
-        for _, g in genomes:
-            net = neat.nn.feed_forward.FeedForwardNetwork.create(g, config)
-            self.nets.append(net)
-            self.den.append(Neat_snake(WIDTH, HEIGHT))
-            g.fitness = 0
-            self.ge.append(g)
+        self.nets = nets
+        self.den = [Neat_snake(WIDTH, HEIGHT) for _ in nets]
+        self.fitness = [0 for _ in nets]
 
         self.frame_rate = frame_rate
         self.font = pygame.font.SysFont(None, 35)
         self.high_score = self.get_high_score()
+        # Show the best twelve games in a 4x3 grid
+        self.layout = Panel_layout(self.screen, self.font, 4, 3, WIDTH,
+                                   HEIGHT, CELL, MARGIN, SCORE_BOARD)
 
         # Setup a clock for framerate
         self.clock = pygame.time.Clock()
@@ -94,15 +95,15 @@ class Training_app:
 
                 # Increase fitness if closer to food and decrease otherwise
                 if snake.calc_dist(head_1, snake.food) < snake.calc_dist(head_1, snake.food):
-                    self.ge[x].fitness += 0.01
+                    self.fitness[x] += 0.01
                 else:
-                    self.ge[x].fitness -= 0.015
+                    self.fitness[x] -= 0.015
 
                 # Decrease fitness if stuck in a loop
                 if snake.body[0] in snake.path:
                     snake.time_loop += 1
                     if snake.time_loop == len(snake.path):
-                        self.ge[x].fitness -= 2
+                        self.fitness[x] -= 2
                         snake.time_loop = 0
                         snake.path = set()
                 snake.path.add(snake.body[0])
@@ -111,12 +112,17 @@ class Training_app:
                 if self.check_lose_conditions(snake):
                     snake.direction = (0, 0)
                     snake.alive = False
-                    self.ge[x].fitness -= 100 / len(snake.body)
+                    self.fitness[x] -= 100 / len(snake.body)
                     continue
 
                 if snake.check_food_eaten():
                     snake.hunger = 0
-                    self.ge[x].fitness += 100 / len(snake.body)
+                    self.fitness[x] += 100 / len(snake.body)
+
+                # The snake filled the board so its game is over
+                if snake.won:
+                    snake.direction = (0, 0)
+                    snake.alive = False
 
         # Check if all snakes are dead
         dead = sum([1 for snake in self.den if not snake.alive])
@@ -128,102 +134,19 @@ class Training_app:
 
     def check_lose_conditions(self, snake):
         """See if the game is over."""
-        head = snake.body[0]
-
-        # Check if snake is out of bounds or hits itself
-        if head not in snake.board or head in snake.body[1:]:
-            return True
-
-        return False
+        return snake.check_lose_conditions()
 
     def on_render(self):
-        """Render the screen each game loop."""
-        genomes_fitnesses = [(x, genome.fitness)
-                             for x, genome in enumerate(self.ge)]
-        best_fitnesses = sorted(
-            genomes_fitnesses, key=lambda i: i[1], reverse=True)[:12]
-
-        best_snakes = [x[0] for x in best_fitnesses]
-
-        # Draw a black background
-        self.screen.fill(BLACK)
-
-        count = 0
-        for game, snake in enumerate(self.den):
-            if game in best_snakes:
-                count += 1
-                if count < 5:
-                    row = 0
-                elif 4 < count < 9:
-                    row = 1
-                else:
-                    row = 2
-
-                if count in [1, 5, 9]:
-                    col = 0
-                elif count in [2, 6, 10]:
-                    col = 1
-                elif count in [3, 7, 11]:
-                    col = 2
-                else:
-                    col = 3
-
-                # Draw the snake vision
-                if self.render_vision:
-                    updated_vision = [tuple(map(
-                        sum, zip(snake.direction, snake.vision[x])))
-                        for x in range(len(snake.vision))]
-                    for cell in updated_vision:
-                        self.render_cell(PURPLE, cell, row, col)
-
-                # Draw the food
-                self.render_cell(RED, snake.food, row, col)
-
-                # Draw the snake
-                for coord in snake.body:
-                    self.render_cell(GREEN, coord, row, col)
-
-                # Draw the head of the snake
-                self.render_cell(DARK_GREEN, snake.body[0], row, col)
-
-                # Draw the scoreboard background
-                pygame.draw.rect(self.screen, GREY,
-                                 [0 + col * SCREEN_WIDTH,
-                                  ((MARGIN + CELL) * HEIGHT + MARGIN) +
-                                  row * SCREEN_HEIGHT,
-                                  ((MARGIN + CELL) * WIDTH + MARGIN),
-                                  SCORE_BOARD
-                                  ])
-
-                # Store text for scores
-                current_score = self.font.render(
-                    f"Score: {snake.score}", True, BLACK)
-                if snake.score < self.high_score:
-                    high_score = self.font.render(
-                        f"High Score: {self.high_score}", True, BLACK)
-                else:
-                    high_score = self.font.render(
-                        f"High Score: {snake.score}", True, BLACK)
-
-                # Draw Scores
-                self.screen.blit(current_score, (5 + col * SCREEN_WIDTH,
-                                                 (MARGIN + CELL) * HEIGHT + MARGIN + 5 + row * SCREEN_HEIGHT))
-                self.screen.blit(high_score, ((((MARGIN + CELL) * WIDTH +
-                                                MARGIN) // 2) + col * SCREEN_WIDTH, (MARGIN + CELL) *
-                                              HEIGHT + MARGIN + 5 + row * SCREEN_HEIGHT))
-
-        # Display the screen
-        pygame.display.flip()
-
-    def render_cell(self, color, coord, row, col):
-        """Render a single cell of the game board."""
-        pygame.draw.rect(self.screen, color,
-                         [(((MARGIN + CELL) * coord[0] + MARGIN)) + col * SCREEN_WIDTH,
-                             ((MARGIN + CELL) *
-                              coord[1] + MARGIN) + row * SCREEN_HEIGHT,
-                             CELL,
-                             CELL
-                          ])
+        """Render the screen each game loop, drawing only what changed."""
+        # Ties go to the first game
+        fitness = self.fitness
+        best_snakes = [self.den[x] for x in nlargest(
+            len(self.layout), range(len(fitness)), key=fitness.__getitem__)]
+        rects = self.layout.draw(best_snakes, self.high_score,
+                                 vision=self.render_vision)
+
+        # Display only the parts of the screen drawn on
+        pygame.display.update(rects)
 
     def on_cleanup(self):
         """Exit the game."""
@@ -268,11 +191,22 @@ def replay_genome(config_path, genome_path):
     with open(genome_path, "rb") as f:
         genome = pickle.load(f)
 
-    # Convert loaded genome into required data structure
-    genomes = [(1, genome)]
-
     # Call game with only the loaded genome
-    Training_app(genomes, config, frame_rate=75).on_execute()
+    net = neat.nn.feed_forward.FeedForwardNetwork.create(genome, config)
+    Training_app([net], frame_rate=75).on_execute()
+
+
+def replay_network(network_path):
+    """Watch a game played by an exported network, no neat needed."""
+    Training_app([load_network(network_path)], frame_rate=75).on_execute()
+
+
+def replay(config_path, snake_path):
+    """Watch a snake from either a network file or a pickled genome."""
+    if snake_path.endswith(NETWORK_SUFFIX):
+        replay_network(snake_path)
+    else:
+        replay_genome(config_path, snake_path)
 
 
 if __name__ == "__main__":
@@ -280,7 +214,7 @@ if __name__ == "__main__":
         genome_path = sys.argv[1]
         local_dir = os.path.dirname(__file__)
         config_path = os.path.join(local_dir, "config-feedforward.txt")
-        replay_genome(config_path, genome_path)
+        replay(config_path, genome_path)
     except (IndexError, FileNotFoundError):
-        print("Please provide a valid pickled snake genome file.")
+        print("Please provide a valid snake network or pickled genome file.")
         sys.exit()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+
+"""Serve snake moves on a local socket, or load test a running server.
+
+    ./Policy_server.py serve exported_snakes/neat_snake_4.snet
+    ./Policy_server.py serve --planner a_star
+    ./Policy_server.py load --games 64
+"""
+
+import json
+import asyncio
+import argparse
+from random import Random
+from time import perf_counter
+
+from snakes.Snake import Snake
+from inference.Policy import Policy
+from inference.Server import (Network_brain, Planner_brain, Policy_server,
+                              game_state, percentiles)
+
+# Define global constants
+WIDTH = 50
+HEIGHT = 35
+
+
+async def play_remote(host, port, seed, max_steps, latencies):
+    """Play a game with every move asked of the server. Returns the score."""
+    reader, writer = await asyncio.open_connection(host, port)
+    snake = Snake(WIDTH, HEIGHT, Random(seed))
+    # Start off moving so the network has a way it is going
+    snake.direction = (-1, 0)
+
+    try:
+        for step in range(max_steps):
+            if snake.check_lose_conditions():
+                break
+            snake.check_food_eaten()
+            if snake.won:
+                break
+
+            start = perf_counter()
+            request = {"id": step, "state": game_state(snake)}
+            writer.write(json.dumps(request).encode() + b"\n")
+            response = json.loads(await reader.readline())
+            latencies.append(perf_counter() - start)
+
+            snake.direction = tuple(response["direction"])
+            snake.update_body()
+    finally:
+        writer.close()
+
+    return snake.score
+
+
+async def fetch_stats(host, port):
+    """Ask the server for its stats."""
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"stats": true}\n')
+    stats = json.loads(await reader.readline())
+    writer.close()
+    return stats
+
+
+async def load_test(host, port, games, max_steps, seed):
+    """Play many games against the server at once and time them."""
+    latencies = []
+    start = perf_counter()
+    scores = await asyncio.gather(*[
+        play_remote(host, port, f"{seed}:{game}", max_steps, latencies)
+        for game in range(games)])
+    seconds = perf_counter() - start
+
+    return {
+        "games": games,
+        "moves": len(latencies),
+        "seconds": seconds,
+        "moves_per_second": len(latencies) / seconds if seconds else None,
+        "mean_score": sum(scores) / len(scores),
+        "client_latency_ms": {key: value * 1e3 for key, value
+                              in percentiles(latencies).items()},
+        "server": await fetch_stats(host, port)
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve snake moves.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    serve = commands.add_parser("serve", help="answer move requests")
+    serve.add_argument("network", nargs="?",
+                       help="exported network file to play with")
+    serve.add_argument("--planner", choices=["a_star"],
+                       help="plan moves with A* instead of a network")
+    serve.add_argument("--max-batch", type=int, default=256,
+                       help="most requests to decide at once")
+    serve.add_argument("--max-wait-ms", type=float, default=2,
+                       help="longest a request waits for its batch to fill")
+    serve.add_argument("--report-every", type=float, default=10,
+                       help="seconds between printing the stats")
+
+    load = commands.add_parser("load", help="play games against a server")
+    load.add_argument("--games", type=int, default=64,
+                      help="games to play at once")
+    load.add_argument("--max-steps", type=int, default=500,
+                      help="moves to play each game for at most")
+    load.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.command == "serve":
+        if args.planner == "a_star":
+            brain = Planner_brain()
+        elif args.network is not None:
+            brain = Network_brain(Policy.load(args.network))
+        else:
+            parser.error("serve needs a network file or --planner")
+
+        server = Policy_server(brain, args.host, args.port,
+                               max_batch=args.max_batch,
+                               max_wait=args.max_wait_ms / 1000)
+        print(f"Serving on {args.host}:{args.port}", flush=True)
+        try:
+            asyncio.run(server.serve(report_every=args.report_every))
+        except KeyboardInterrupt:
+            pass
+    else:
+        print(json.dumps(asyncio.run(load_test(
+            args.host, args.port, args.games, args.max_steps, args.seed)),
+            indent=2))
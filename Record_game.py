@@ -0,0 +1,379 @@
+#!/usr/bin/env python3
+
+"""Record a game to a GIF, or to a directory of frames, without a window.
+
+The game is drawn on an offscreen palette surface by the same Board_view
+as the apps, so each frame only holds the cells that changed. Those are
+handed to a writer thread through a bounded queue, and the GIF writer
+streams each change out as a small sub-image with the unchanged pixels
+left transparent, so memory stays flat however long the game runs.
+
+    ./Record_game.py a_star --output a_star.gif --max-steps 10000
+"""
+
+import os
+import sys
+import queue
+import struct
+import argparse
+import threading
+from random import Random
+
+# Recording never opens a window
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+import pygame
+
+from snakes.Snake import Snake
+from snakes.Simple_ai_snake import Simple_ai_snake
+from snakes.A_star_snake import A_star_snake
+from snakes.Game import Game, ai_policy, player_policy
+from snakes.Replay_log import Replay_recorder
+from inference.Policy import Policy, new_game
+from Renderer import (BLACK, GREY, GREEN, DARK_GREEN, RED, PURPLE,
+                      Board_view, Score_board, path_shades, vision_cells)
+
+LOCAL_DIR = os.path.dirname(os.path.abspath(__file__))
+NETWORK_PATH = os.path.join(LOCAL_DIR, "exported_snakes", "neat_snake_4.snet")
+
+CELL = 10
+MARGIN = 1
+WIDTH = 50
+HEIGHT = 35
+SCORE_BOARD = 30
+
+# The last palette entry is never drawn with, it marks unchanged pixels
+TRANSPARENT = 255
+
+
+def game_palette():
+    """Every colour a game is drawn with, with room left for transparency."""
+    colours = [BLACK, GREY, GREEN, DARK_GREEN, RED, PURPLE]
+    # Every shade of an A* path, the longest ones fade to black
+    for shade in path_shades([None] * 64).values():
+        if shade not in colours:
+            colours.append(shade)
+
+    return colours + [BLACK] * (256 - len(colours))
+
+
+def lzw_codes(data, min_code_size):
+    """
+    The codes of GIF's variable length LZW for palette indices, each with
+    its width in bits. Every prefix of a string in the table is in it too,
+    so the longest match at each point is found by doubling then halving
+    its length instead of one pixel at a time, which makes the long runs
+    of a delta frame cheap.
+    """
+    clear = 1 << min_code_size
+    end = clear + 1
+
+    def reset():
+        return {bytes([x]): x for x in range(clear)}, end + 1, min_code_size + 1
+
+    table, next_code, code_size = reset()
+    codes = [(clear, code_size)]
+    position = 0
+    length = len(data)
+    while position < length:
+        limit = length - position
+        found = 1
+        size = 2
+        while size <= limit and data[position:position + size] in table:
+            found = size
+            size *= 2
+        missing = min(size, limit + 1)
+        while missing - found > 1:
+            middle = (found + missing) // 2
+            if data[position:position + middle] in table:
+                found = middle
+            else:
+                missing = middle
+
+        codes.append((table[data[position:position + found]], code_size))
+        if position + found < length:
+            if next_code < 4096:
+                table[data[position:position + found + 1]] = next_code
+                next_code += 1
+                if next_code > 1 << code_size and code_size < 12:
+                    code_size += 1
+            else:
+                codes.append((clear, code_size))
+                table, next_code, code_size = reset()
+        position += found
+    # A reader adds a table entry for the last code too, which can widen
+    # the end code
+    if next_code + 1 > 1 << code_size and code_size < 12:
+        code_size += 1
+    codes.append((end, code_size))
+    return codes
+
+
+def lzw_encode(data, min_code_size):
+    """Compress palette indices with GIF's variable length LZW."""
+    out = bytearray()
+    bits = 0
+    bit_count = 0
+
+    # Pack the codes least significant bit first
+    for code, size in lzw_codes(data, min_code_size):
+        bits |= code << bit_count
+        bit_count += size
+        while bit_count >= 8:
+            out.append(bits & 0xFF)
+            bits >>= 8
+            bit_count -= 8
+    if bit_count:
+        out.append(bits & 0xFF)
+
+    return bytes(out)
+
+
+def delta_image(changes):
+    """
+    Lay the changed rects of a frame on one sub-image covering them all,
+    transparent wherever nothing changed. Returns the sub-image's rect and
+    its palette indices.
+    """
+    area = changes[0][0].unionall([rect for rect, _ in changes[1:]])
+    image = bytearray([TRANSPARENT]) * (area.width * area.height)
+    for rect, indices in changes:
+        for row in range(rect.height):
+            start = (rect.top - area.top + row) * area.width + rect.left - area.left
+            image[start:start + rect.width] = \
+                indices[row * rect.width:(row + 1) * rect.width]
+
+    return area, bytes(image)
+
+
+class Gif_writer:
+    """A class to house a GIF being written a frame at a time."""
+
+    def __init__(self, path, size, palette, delay=4):
+        self.file = open(path, "wb")
+        self.delay = delay
+        self.frames = 0
+
+        width, height = size
+        self.file.write(b"GIF89a")
+        # A global table of 256 colours
+        self.file.write(struct.pack("<HHBBB", width, height, 0xF7, 0, 0))
+        self.file.write(bytes(channel for colour in palette
+                              for channel in colour))
+        # Loop forever
+        self.file.write(b"\x21\xFF\x0BNETSCAPE2.0\x03\x01\x00\x00\x00")
+
+    def write(self, changes):
+        """Add a frame made of the changed rects and their indices."""
+        area, image = delta_image(changes)
+
+        # Leave the last frame in place and see through to it
+        self.file.write(struct.pack("<BBBBHBB", 0x21, 0xF9, 4, 0x05,
+                                    self.delay, TRANSPARENT, 0))
+        self.file.write(struct.pack("<BHHHHB", 0x2C, area.left, area.top,
+                                    area.width, area.height, 0))
+        self.file.write(b"\x08")
+        data = lzw_encode(image, 8)
+        for start in range(0, len(data), 255):
+            block = data[start:start + 255]
+            self.file.write(bytes([len(block)]) + block)
+        self.file.write(b"\x00")
+        self.frames += 1
+
+    def close(self):
+        self.file.write(b"\x3B")
+        self.file.close()
+
+
+class Frame_files:
+    """
+    A class to house a directory of raw frames, one binary PPM per frame.
+    The frame is kept as palette indices and the changes laid on it.
+    """
+
+    def __init__(self, directory, size, palette):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.width, self.height = size
+        self.canvas = bytearray(self.width * self.height)
+        self.channels = [bytes(colour[x] for colour in palette)
+                         for x in range(3)]
+        self.frames = 0
+
+    def write(self, changes):
+        """Write the next frame with the changed rects laid on the last."""
+        for rect, indices in changes:
+            for row in range(rect.height):
+                start = (rect.top + row) * self.width + rect.left
+                self.canvas[start:start + rect.width] = \
+                    indices[row * rect.width:(row + 1) * rect.width]
+
+        pixels = bytearray(len(self.canvas) * 3)
+        for x, channel in enumerate(self.channels):
+            pixels[x::3] = self.canvas.translate(channel)
+
+        path = os.path.join(self.directory, f"frame_{self.frames:06d}.ppm")
+        with open(path, "wb") as file:
+            file.write(f"P6 {self.width} {self.height} 255\n".encode())
+            file.write(pixels)
+        self.frames += 1
+
+    def close(self):
+        pass
+
+
+class Recorder:
+    """
+    A class to house an offscreen game drawing. Each frame the board draws
+    what changed onto a palette surface, the indices of those rects are
+    read off and queued, and a worker thread hands them to the writer. The
+    queue is bounded, so if the writer falls behind the game waits.
+    """
+
+    def __init__(self, writer_class, target, width=WIDTH, height=HEIGHT,
+                 cell=CELL, margin=MARGIN, score_board=SCORE_BOARD,
+                 high_score=0, queue_size=64, **options):
+        pygame.font.init()
+        board_width = (margin + cell) * width + margin
+        board_height = (margin + cell) * height + margin
+        self.size = (board_width, board_height + score_board)
+        self.palette = game_palette()
+
+        self.surface = pygame.Surface(self.size, 0, 8)
+        self.surface.set_palette(self.palette)
+        self.board = Board_view(self.surface, width, height, cell, margin)
+        font = pygame.font.SysFont(None, max(score_board, 12))
+        self.score_board = Score_board(self.surface, font, [
+            0, board_height, board_width, score_board])
+        self.high_score = high_score
+
+        self.writer = writer_class(target, self.size, self.palette, **options)
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.error = None
+        self.thread = threading.Thread(target=self.work, daemon=True)
+        self.thread.start()
+
+    def work(self):
+        """Write queued frames until told to stop."""
+        while True:
+            changes = self.queue.get()
+            if changes is None:
+                return
+            # Keep draining so the game never blocks on a dead writer
+            if self.error is None:
+                try:
+                    self.writer.write(changes)
+                except Exception as error:
+                    self.error = error
+
+    def frame(self, snake, overlay=None):
+        """Draw a frame of a snake's game and queue what changed."""
+        rects = self.board.draw(snake, overlay)
+        rects += self.score_board.draw(snake.score,
+                                       max(snake.score, self.high_score))
+        # The first frame clears the board and draws the scores, so it
+        # covers the whole picture
+        if not rects:
+            return
+
+        changes = [(rect, pygame.image.tostring(
+            self.surface.subsurface(rect), "P")) for rect in rects]
+        self.queue.put(changes)
+
+    def close(self):
+        """Finish writing the queued frames and close the writer."""
+        self.queue.put(None)
+        self.thread.join()
+        self.writer.close()
+        if self.error is not None:
+            raise self.error
+
+
+def make_game(kind, width, height, seed, max_steps, network_path):
+    """A headless game with one of the kinds of snake."""
+    rng = Random(seed)
+    if kind == "play":
+        return Game(Snake(width, height, rng),
+                    player_policy(Random(rng.random())), max_steps)
+    if kind == "simple":
+        return Game(Simple_ai_snake(width, height, rng), ai_policy, max_steps)
+    if kind == "a_star":
+        return Game(A_star_snake(width, height, rng), ai_policy, max_steps)
+    if kind == "neat":
+        return new_game(Policy.load(network_path), width, height,
+                        seed=rng.random(), max_steps=max_steps)
+    raise ValueError(f"Unknown kind of snake {kind!r}")
+
+
+def overlay(snake, vision):
+    """The path of an A* snake, or the rays of a NEAT snake with vision."""
+    if isinstance(snake, A_star_snake) and snake.render_path:
+        return path_shades(snake.path)
+    if vision and getattr(snake, "rays", None) is not None:
+        return vision_cells(snake)
+    return None
+
+
+def record(game, recorder, every=1, vision=False, replay=None):
+    """
+    Play a game to the end, recording every so many steps. A
+    Replay_recorder, if any, logs every move.
+    """
+    recorder.frame(game.snake, overlay(game.snake, vision))
+    if replay is not None:
+        replay.observe(game.snake)
+    while game.running:
+        game.on_loop()
+        if replay is not None:
+            replay.observe(game.snake)
+        if game.steps % every == 0 or not game.running:
+            recorder.frame(game.snake, overlay(game.snake, vision))
+
+    return game.snake.score
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Record a game of snake.")
+    parser.add_argument("kind", choices=["play", "simple", "a_star", "neat"])
+    parser.add_argument("--output", default="game.gif",
+                        help="GIF to write, or a directory for raw frames")
+    parser.add_argument("--frames", action="store_true",
+                        help="write a PPM file per frame instead of a GIF")
+    parser.add_argument("--max-steps", type=int, default=10000)
+    parser.add_argument("--every", type=int, default=1,
+                        help="record every Nth step")
+    parser.add_argument("--fps", type=float, default=25,
+                        help="frames a second the GIF plays at")
+    parser.add_argument("--cell", type=int, default=CELL,
+                        help="size of a cell in pixels")
+    parser.add_argument("--width", type=int, default=WIDTH)
+    parser.add_argument("--height", type=int, default=HEIGHT)
+    parser.add_argument("--vision", action="store_true",
+                        help="draw the rays of a NEAT snake")
+    parser.add_argument("--network", default=NETWORK_PATH,
+                        help="exported network a NEAT snake plays with")
+    parser.add_argument("--log",
+                        help="also save a replay log of the game here")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    game = make_game(args.kind, args.width, args.height, args.seed,
+                     args.max_steps, args.network)
+    if args.frames:
+        recorder = Recorder(Frame_files, args.output, args.width, args.height,
+                            cell=args.cell)
+    else:
+        recorder = Recorder(Gif_writer, args.output, args.width, args.height,
+                            cell=args.cell, delay=max(1, round(100 / args.fps)))
+    replay = None
+    if args.log:
+        replay = Replay_recorder(args.width, args.height, seed=args.seed,
+                                 kind=args.kind)
+    try:
+        score = record(game, recorder, every=args.every, vision=args.vision,
+                       replay=replay)
+    finally:
+        recorder.close()
+    if replay is not None:
+        replay.save(args.log)
+    print(f"Recorded {recorder.writer.frames} frames of a game scoring "
+          f"{score} to {args.output}", file=sys.stderr)
@@ -0,0 +1,274 @@
+#!/usr/bin/env python3
+
+"""Draw games of snake by redrawing only the cells that changed."""
+
+from collections import deque
+import pygame
+
+BLACK = (0, 0, 0)
+GREY = (200, 200, 200)
+GREEN = (0, 255, 0)
+DARK_GREEN = (0, 200, 75)
+RED = (255, 0, 0)
+PURPLE = (147, 132, 240)
+
+
+def path_shades(path):
+    """Shade each cell of an A* path darker the further along it is."""
+    shades = {}
+    for count, coord in enumerate(path[::-1], 1):
+        shades[coord] = tuple(x - 4 * count if x > 4 * count else 0
+                              for x in PURPLE)
+    return shades
+
+
+def vision_cells(snake):
+    """The cells a Neat_snake's rays crossed, as drawn by the apps."""
+    return {tuple(map(sum, zip(snake.direction, cell))): PURPLE
+            for cell in snake.vision}
+
+
+class Board_view:
+    """
+    A class to house one board drawn on the screen. It remembers the colour
+    of every cell it drew and follows the body as it moves, so each frame
+    only the new head, the old head, the vacated tail, the food and the
+    cells of an overlay that changed, like the A* path, are drawn again.
+    Draws return the rects they touched to pass to display.update.
+    """
+
+    def __init__(self, screen, width, height, cell, margin, left=0, top=0):
+        self.screen = screen
+        self.width = width
+        self.height = height
+        self.cell = cell
+        self.margin = margin
+        self.left = left
+        self.top = top
+        self.area = pygame.Rect(left, top, (margin + cell) * width + margin,
+                                (margin + cell) * height + margin)
+
+        self.snake = None
+        # The body as last drawn, head first
+        self.body = deque()
+        self.food = None
+        self.overlay = {}
+        # Every cell drawn in a colour other than the background
+        self.colours = {}
+
+    def clear(self):
+        """Paint the board black and forget what was on it."""
+        self.screen.fill(BLACK, self.area)
+        self.snake = None
+        self.body = deque()
+        self.food = None
+        self.overlay = {}
+        self.colours = {}
+        return [self.area]
+
+    def rect(self, coord):
+        step = self.margin + self.cell
+        return pygame.Rect(self.left + step * coord[0] + self.margin,
+                           self.top + step * coord[1] + self.margin,
+                           self.cell, self.cell)
+
+    def colour(self, coord):
+        """The colour a cell should be now."""
+        snake = self.snake
+        if coord == snake.body[0]:
+            return DARK_GREEN
+        if coord in snake.occupied:
+            return GREEN
+        if coord == snake.food:
+            return RED
+        return self.overlay.get(coord, BLACK)
+
+    def body_changes(self, snake):
+        """
+        Catch the kept body up with the snake and return the cells that
+        changed. The snake only grows at the head and shrinks at the tail,
+        so the new cells are those in front of the old head. If the old head
+        can't be found the whole body is taken again.
+        """
+        body = self.body
+        old_head = body[0] if body else None
+        heads = []
+        for cell in snake.body:
+            if cell == old_head:
+                break
+            heads.append(cell)
+
+        length = len(snake.body)
+        kept = length - len(heads)
+        # The snake hasn't moved
+        if not heads and len(body) == length and body[-1] == snake.body[-1]:
+            return set()
+
+        # The rest of the snake has to line up with the old body
+        if not heads or kept < 1 or kept > len(body) or (
+                body[kept - 1] != snake.body[-1]):
+            changed = set(body)
+            changed.update(snake.body)
+            self.body = deque(snake.body)
+            return changed
+
+        changed = set(heads)
+        changed.add(old_head)
+        body.extendleft(reversed(heads))
+        while len(body) > length:
+            changed.add(body.pop())
+        return changed
+
+    def draw(self, snake, overlay=None):
+        """Bring the board up to date with a snake."""
+        overlay = overlay if overlay is not None else {}
+        rects = []
+        if snake is not self.snake:
+            rects.extend(self.clear())
+            self.snake = snake
+            self.body = deque(snake.body)
+            changed = set(self.body)
+            changed.update(overlay)
+        else:
+            changed = self.body_changes(snake)
+            changed.update(coord for coord in self.overlay
+                           if coord not in overlay)
+            changed.update(coord for coord, colour in overlay.items()
+                           if self.overlay.get(coord) != colour)
+        changed.add(self.food)
+        changed.add(snake.food)
+        self.food = snake.food
+        self.overlay = overlay
+
+        for coord in changed:
+            # Cells off the board, like the head of a snake that hit the
+            # wall, would spill onto whatever is drawn next to the board
+            if coord is None or not (0 <= coord[0] < self.width
+                                     and 0 <= coord[1] < self.height):
+                continue
+            colour = self.colour(coord)
+            if self.colours.get(coord, BLACK) == colour:
+                continue
+            if colour == BLACK:
+                del self.colours[coord]
+            else:
+                self.colours[coord] = colour
+            rect = self.rect(coord)
+            self.screen.fill(colour, rect)
+            rects.append(rect)
+
+        return rects
+
+
+class Score_board:
+    """
+    A class to house the strip of scores under a board. The text is only
+    rendered again when a score changes.
+    """
+
+    def __init__(self, screen, font, area):
+        self.screen = screen
+        self.font = font
+        self.area = pygame.Rect(area)
+        self.shown = None
+        # The text last rendered in each place and its surface
+        self.texts = {}
+
+    def clear(self):
+        """Draw the scores again on the next draw."""
+        self.shown = None
+
+    def blank(self):
+        """Paint over the scores with the background."""
+        self.shown = None
+        self.screen.fill(BLACK, self.area)
+        return [self.area]
+
+    def draw(self, score, high_score):
+        """Show the scores if they changed."""
+        if (score, high_score) == self.shown:
+            return []
+        self.shown = (score, high_score)
+
+        area = self.area
+        self.screen.fill(GREY, area)
+        self.screen.blit(self.text("score", f"Score: {score}"),
+                         (area.left + 5, area.top + 5))
+        self.screen.blit(self.text("high_score", f"High Score: {high_score}"),
+                         (area.left + area.width // 2, area.top + 5))
+        return [area]
+
+    def text(self, place, text):
+        """Render a line of text, unless it is already showing there."""
+        if self.texts.get(place, (None,))[0] != text:
+            self.texts[place] = (text, self.font.render(text, True, BLACK))
+        return self.texts[place][1]
+
+
+class Panel_layout:
+    """
+    A class to house a grid of panels, each a board with its scores under
+    it, filled left to right and top to bottom. A snake keeps its panel for
+    as long as it is shown, and a snake new to the grid takes the panel of
+    one that left, so panels only draw what changed between frames.
+    """
+
+    def __init__(self, screen, font, columns, rows, width, height, cell,
+                 margin, score_board):
+        self.columns = columns
+        self.rows = rows
+        board_width = (margin + cell) * width + margin
+        board_height = (margin + cell) * height + margin
+
+        self.panels = []
+        for number in range(columns * rows):
+            row, col = divmod(number, columns)
+            left = col * board_width
+            top = row * (board_height + score_board)
+            self.panels.append((
+                Board_view(screen, width, height, cell, margin, left, top),
+                Score_board(screen, font, [left, top + board_height,
+                                           board_width, score_board])))
+        self.shown = [None for _ in self.panels]
+
+    def __len__(self):
+        return len(self.panels)
+
+    def assign(self, snakes):
+        """Give each of up to one panel's worth of snakes a panel."""
+        snakes = snakes[:len(self.panels)]
+        keep = {id(snake) for snake in snakes}
+        shown = self.shown
+        for number, snake in enumerate(shown):
+            if snake is not None and id(snake) not in keep:
+                shown[number] = None
+
+        placed = {id(snake) for snake in shown if snake is not None}
+        free = (number for number, snake in enumerate(shown) if snake is None)
+        for snake in snakes:
+            if id(snake) not in placed:
+                shown[next(free)] = snake
+
+    def draw(self, snakes, high_score, vision=False):
+        """
+        Show the snakes, drawing what changed in their panels, with their
+        rays if vision is on. Returns the rects drawn.
+        """
+        self.assign(snakes)
+        rects = []
+        for (board, score_board), snake in zip(self.panels, self.shown):
+            # Blank a panel left without a snake
+            if snake is None:
+                if board.snake is not None:
+                    rects += board.clear()
+                    rects += score_board.blank()
+                continue
+            # A new snake in the panel needs its scores drawn again
+            if snake is not board.snake:
+                score_board.clear()
+
+            overlay = vision_cells(snake) if vision else None
+            rects += board.draw(snake, overlay)
+            rects += score_board.draw(snake.score,
+                                      max(snake.score, high_score))
+        return rects
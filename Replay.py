@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+"""Watch a logged game again, seeking to any move.
+
+Space pauses, the arrow keys step a move back or on, page up and page
+down jump a keyframe's worth of moves, and home and end go to the start
+and the end of the game.
+
+    ./Replay.py game.snlog --move 1200
+    ./Replay.py game.snlog --gif game.gif
+"""
+
+import sys
+import argparse
+import pygame
+
+from snakes.Replay_log import Replay_log
+from Renderer import Board_view, Score_board
+from App import CELL, MARGIN, SCORE_BOARD
+
+
+class Replay_app:
+    """Class to house the window a logged game is played back in."""
+
+    def __init__(self, log, move=0, frame_rate=15):
+        pygame.init()
+        self.running = True
+        self.paused = False
+        self.log = log
+        board_width = (MARGIN + CELL) * log.width + MARGIN
+        board_height = (MARGIN + CELL) * log.height + MARGIN
+        self.screen = pygame.display.set_mode((board_width,
+                                               board_height + SCORE_BOARD))
+
+        self.board = Board_view(self.screen, log.width, log.height, CELL,
+                                MARGIN)
+        self.font = pygame.font.SysFont(None, 36)
+        self.score_board = Score_board(self.screen, self.font, [
+            0, board_height, board_width, SCORE_BOARD])
+        # The best score is the game's final one
+        self.high_score = log.snake_at(len(log)).score
+
+        self.frame_rate = frame_rate
+        self.clock = pygame.time.Clock()
+        self.seek(move)
+
+    def seek(self, move):
+        """Jump to the game as it was after a number of moves."""
+        self.move = max(0, min(move, len(self.log)))
+        self.snake = self.log.snake_at(self.move)
+        self.score_board.clear()
+
+    def on_event(self, event):
+        """Handle events each game loop."""
+        if event.type == pygame.QUIT:
+            self.running = False
+        if event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_ESCAPE:
+                self.running = False
+            elif event.key == pygame.K_SPACE:
+                self.paused = not self.paused
+            elif event.key == pygame.K_RIGHT:
+                self.paused = True
+                self.step()
+            elif event.key == pygame.K_LEFT:
+                self.paused = True
+                self.seek(self.move - 1)
+            elif event.key == pygame.K_PAGEUP:
+                self.seek(self.move - self.log.keyframe_every)
+            elif event.key == pygame.K_PAGEDOWN:
+                self.seek(self.move + self.log.keyframe_every)
+            elif event.key == pygame.K_HOME:
+                self.seek(0)
+            elif event.key == pygame.K_END:
+                self.seek(len(self.log))
+
+    def step(self):
+        """Make the next move of the game."""
+        if self.move < len(self.log):
+            self.log.advance(self.snake, self.move)
+            self.move += 1
+
+    def on_loop(self):
+        """Play on unless paused, pausing at the end of the game."""
+        if not self.paused:
+            self.step()
+            if self.move == len(self.log):
+                self.paused = True
+
+        self.clock.tick(self.frame_rate)
+
+    def on_render(self):
+        """Render what changed since the last frame."""
+        rects = self.board.draw(self.snake)
+        rects += self.score_board.draw(self.snake.score, self.high_score)
+        pygame.display.set_caption(f"Move {self.move} of {len(self.log)}")
+        pygame.display.update(rects)
+
+    def on_execute(self):
+        """Start the game loop."""
+        while self.running:
+            for event in pygame.event.get():
+                self.on_event(event)
+            self.on_render()
+            self.on_loop()
+        pygame.quit()
+
+
+def save_gif(log, path, start=0, every=1, fps=25):
+    """Record a logged game from a move on to a GIF, without a window."""
+    # Only the recorder is headless, so it isn't imported for the window
+    from Record_game import Gif_writer, Recorder
+
+    recorder = Recorder(Gif_writer, path, log.width, log.height,
+                        delay=max(1, round(100 / fps)))
+    try:
+        snake = log.snake_at(start)
+        recorder.frame(snake)
+        for move in range(start, len(log)):
+            log.advance(snake, move)
+            if (move + 1 - start) % every == 0 or move + 1 == len(log):
+                recorder.frame(snake)
+    finally:
+        recorder.close()
+    return recorder.writer.frames
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Watch a logged game.")
+    parser.add_argument("log", help="replay log to play back")
+    parser.add_argument("--move", type=int, default=0,
+                        help="move to start from")
+    parser.add_argument("--fps", type=float, default=15,
+                        help="moves a second to play back at")
+    parser.add_argument("--gif", help="record the game to this GIF instead "
+                        "of opening a window")
+    parser.add_argument("--every", type=int, default=1,
+                        help="record every Nth move to the GIF")
+    args = parser.parse_args()
+
+    try:
+        log = Replay_log.load(args.log)
+    except (OSError, ValueError) as error:
+        sys.exit(error)
+
+    print(f"{len(log)} moves of a {log.kind or 'snake'} game on a "
+          f"{log.width}x{log.height} board, seed {log.seed}")
+    if args.gif:
+        frames = save_gif(log, args.gif, start=args.move, every=args.every,
+                          fps=args.fps)
+        print(f"Recorded {frames} frames to {args.gif}")
+    else:
+        Replay_app(log, move=args.move, frame_rate=args.fps).on_execute()
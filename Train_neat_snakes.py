@@ -4,21 +4,24 @@
 
 import sys
 import os
-from random import randint
+import argparse
+import random
+from functools import partial
+from heapq import nlargest
+from time import perf_counter
 import neat
 import pickle
-import pygame
-from pygame.locals import (
-    KEYDOWN,
-    K_UP,
-    K_DOWN,
-    K_LEFT,
-    K_RIGHT,
-    K_SPACE,
-    K_ESCAPE,
-    QUIT
-)
-from snakes.Neat_snake import Neat_snake
+from snakes.Compiled_network import Compiled_network
+from snakes.Network_file import save_network
+from training.Evaluator import (Parallel_evaluator, Run_seed, make_engine,
+                                play_episodes)
+from training.Fitness_cache import Fitness_cache
+from training.Replay_keeper import Replay_keeper
+from training.Checkpointer import (Checkpointer, latest_checkpoint,
+                                   load_checkpoint, restore_population)
+from training.Episodes import AGGREGATES, Episode_schedule, evaluate_episodes
+from training.Profiler import Profiler
+from training.Profile_reporter import Profile_reporter
 
 # Define global constants
 CELL = 7
@@ -26,6 +29,8 @@ MARGIN = 1
 WIDTH = 50
 HEIGHT = 35
 SCORE_BOARD = 35
+# Games the fitness cache remembers when it is on
+CACHE_SIZE = 100000
 SCREEN_WIDTH = (WIDTH * CELL + (MARGIN * WIDTH + 1))
 SCREEN_HEIGHT = (HEIGHT * CELL + (MARGIN * HEIGHT + 1)) + SCORE_BOARD
 
@@ -37,34 +42,54 @@ RED = (255, 0, 0)
 BLUE = (0, 0, 255)
 PURPLE = (147, 132, 240)
 
+# Rendering is optional, so pygame is only imported once a window opens
+pygame = None
+Panel_layout = None
 
-class Training_app:
-    """Class to house the game."""
 
-    def __init__(self, genomes, config, frame_rate=0):
+def import_pygame():
+    """
+    Import pygame and the Renderer the first time they are needed. Returns
+    whether they are installed.
+    """
+    global pygame, Panel_layout
+    if pygame is None:
+        try:
+            import pygame
+            from Renderer import Panel_layout
+        except ImportError:
+            return False
+    return True
+
+
+class Training_app:
+    """
+    Class to house the window that watches a generation train. By default
+    the games run flat out and the window samples them display_rate times
+    a second, the steps in between aren't drawn. The engine waits while a
+    frame is drawn, so each frame shows a whole step. A frame_rate instead
+    draws every step and slows the games to that many steps a second.
+    """
+
+    def __init__(self, engine, frame_rate=0, display_rate=30):
         pygame.init()
-        self.running = True
         self.render_vision = False
         self.screen = pygame.display.set_mode((
             SCREEN_WIDTH * 4, SCREEN_HEIGHT * 3
         ))
 
-        self.config = config
-
-        self.den = []
-        self.nets = []
-        self.ge = []
-
-        for _, g in genomes:
-            net = neat.nn.feed_forward.FeedForwardNetwork.create(g, config)
-            self.nets.append(net)
-            self.den.append(Neat_snake(WIDTH, HEIGHT))
-            g.fitness = 0
-            self.ge.append(g)
+        self.engine = engine
+        self.den = engine.den
+        self.profiler = engine.profiler
 
         self.frame_rate = frame_rate
+        self.frame_time = 1 / display_rate if display_rate else 0
+        self.next_frame = 0
         self.font = pygame.font.SysFont(None, 35)
         self.high_score = self.get_high_score()
+        # Show the best twelve games in a 4x3 grid
+        self.layout = Panel_layout(self.screen, self.font, 4, 3, WIDTH,
+                                   HEIGHT, CELL, MARGIN, SCORE_BOARD)
 
         # Setup a clock for framerate
         self.clock = pygame.time.Clock()
@@ -72,168 +97,50 @@ class Training_app:
     def on_event(self, event):
         """Handle events each game loop."""
         if event.type == pygame.QUIT:
-            self.running = False
-        if event.type == KEYDOWN:
+            self.engine.running = False
+        if event.type == pygame.KEYDOWN:
             # Was it the Escape key? If so, then stop the loop.
-            if event.key == K_ESCAPE:
-                self.running = False
-            if event.key == K_SPACE:
+            if event.key == pygame.K_ESCAPE:
+                self.engine.running = False
+            if event.key == pygame.K_SPACE:
                 self.render_vision = not self.render_vision
 
-    def on_loop(self):
-        """Handle game logic each game loop."""
-
-        for x, snake in enumerate(self.den):
-            if snake.alive:
-                head_1 = snake.body[0]
-
-                # Move the snake
-                snake.move_snake(self.nets[x])
-                snake.update_body()
-
-                head_2 = snake.body[0]
-
-                # Increase fitness if closer to food and decrease otherwise
-                if snake.calc_dist(head_1, snake.food) < snake.calc_dist(head_1, snake.food):
-                    self.ge[x].fitness += 1
-                else:
-                    self.ge[x].fitness -= 1.5
-
-                """# Decrease fitness if head is near the edge of board
-                if 0 in head_2 or snake.width in head_2 or snake.height in head_2:
-                    self.ge[x].fitness -= 1"""
-
-                # Check if snake starves and decrease fitness if so
-                if snake.hunger >= len(snake.body) * 75:
-                    snake.direction = (0, 0)
-                    snake.alive = False
-                    self.ge[x].fitness -= 100 / len(snake.body)
-                    continue
-
-                # Check lose conditions
-                if self.check_lose_conditions(snake):
-                    snake.direction = (0, 0)
-                    snake.alive = False
-                    self.ge[x].fitness -= 100 / len(snake.body)
-                    continue
-
-                if snake.check_food_eaten():
-                    self.ge[x].fitness += 10
-                    snake.hunger = 0
-
-        # Check if all snakes are dead
-        dead = sum([1 for snake in self.den if not snake.alive])
-        if dead == len(self.den):
-            self.running = False
+    def on_step(self, engine):
+        """Watch the engine after each of its steps."""
+        # Skip the steps that come before the next frame is due
+        start = perf_counter()
+        if not self.frame_rate:
+            if start < self.next_frame:
+                return
+            self.next_frame = start + self.frame_time
+
+        for event in pygame.event.get():
+            self.on_event(event)
+        if not engine.running:
+            return
+        self.on_render()
+        if self.profiler is not None:
+            rendered = perf_counter()
 
         # Ensure a human playable frame rate
         self.clock.tick(self.frame_rate)
 
-    def check_lose_conditions(self, snake):
-        """See if the game is over."""
-        head = snake.body[0]
-
-        # Check if snake is out of bounds or hits itself
-        if head not in snake.board or head in snake.body[1:]:
-            return True
-
-        return False
+        if self.profiler is not None:
+            self.profiler.add_time("render", rendered - start)
+            self.profiler.add_time("frame_wait", perf_counter() - rendered)
+            self.profiler.count("frames")
 
     def on_render(self):
-        """Render the screen each game loop."""
-        genomes_fitnesses = [(x, genome.fitness)
-                             for x, genome in enumerate(self.ge)]
-        best_fitness = sorted(
-            genomes_fitnesses, key=lambda i: i[1], reverse=True)[:1]
-
-        best_snake = best_fitness[0][0]
-
-        # Draw a black background
-        self.screen.fill(BLACK)
-
-        count = 1
-        for game, snake in enumerate(self.den):
-            if game == best_snake:
-                row, col = 0, 0
-                self.render_game(snake, row, col)
-            if count < 12:
-                count += 1
-
-                if count < 5:
-                    row = 0
-                elif 4 < count < 9:
-                    row = 1
-                else:
-                    row = 2
-
-                if count in [1, 5, 9]:
-                    col = 0
-                elif count in [2, 6, 10]:
-                    col = 1
-                elif count in [3, 7, 11]:
-                    col = 2
-                else:
-                    col = 3
-
-                self.render_game(snake, row, col)
-
-        # Display the screen
-        pygame.display.flip()
-
-    def render_game(self, snake, row, col):
-        # Draw the snake vision
-        if self.render_vision:
-            updated_vision = [tuple(map(
-                sum, zip(snake.direction, snake.vision[x])))
-                for x in range(len(snake.vision))]
-            for cell in updated_vision:
-                self.render_cell(PURPLE, cell, row, col)
-
-        # Draw the food
-        self.render_cell(RED, snake.food, row, col)
-
-        # Draw the snake
-        for coord in snake.body:
-            self.render_cell(GREEN, coord, row, col)
-
-        # Draw the head of the snake
-        self.render_cell(DARK_GREEN, snake.body[0], row, col)
-
-        # Draw the scoreboard background
-        pygame.draw.rect(self.screen, GREY,
-                         [0 + col * SCREEN_WIDTH,
-                          ((MARGIN + CELL) * HEIGHT + MARGIN) +
-                          row * SCREEN_HEIGHT,
-                          ((MARGIN + CELL) * WIDTH + MARGIN),
-                          SCORE_BOARD
-                          ])
-
-        # Store text for scores
-        current_score = self.font.render(
-            f"Score: {snake.score}", True, BLACK)
-        if snake.score < self.high_score:
-            high_score = self.font.render(
-                f"High Score: {self.high_score}", True, BLACK)
-        else:
-            high_score = self.font.render(
-                f"High Score: {snake.score}", True, BLACK)
-
-        # Draw Scores
-        self.screen.blit(current_score, (5 + col * SCREEN_WIDTH,
-                                         (MARGIN + CELL) * HEIGHT + MARGIN + 5 + row * SCREEN_HEIGHT))
-        self.screen.blit(high_score, ((((MARGIN + CELL) * WIDTH +
-                                        MARGIN) // 2) + col * SCREEN_WIDTH, (MARGIN + CELL) *
-                                      HEIGHT + MARGIN + 5 + row * SCREEN_HEIGHT))
-
-    def render_cell(self, color, coord, row, col):
-        """Render a single cell of the game board."""
-        pygame.draw.rect(self.screen, color,
-                         [(((MARGIN + CELL) * coord[0] + MARGIN)) + col * SCREEN_WIDTH,
-                             ((MARGIN + CELL) *
-                              coord[1] + MARGIN) + row * SCREEN_HEIGHT,
-                             CELL,
-                             CELL
-                          ])
+        """Render the screen each game loop, drawing only what changed."""
+        # Only the frames drawn pick the best games, ties going to the first
+        fitness = self.engine.fitness
+        best_snakes = [self.den[x] for x in nlargest(
+            len(self.layout), range(len(fitness)), key=fitness.__getitem__)]
+        rects = self.layout.draw(best_snakes, self.high_score,
+                                 vision=self.render_vision)
+
+        # Display only the parts of the screen drawn on
+        pygame.display.update(rects)
 
     def on_cleanup(self):
         """Exit the game."""
@@ -250,14 +157,7 @@ class Training_app:
 
     def on_execute(self):
         """Start the game loop."""
-
-        while self.running:
-            for event in pygame.event.get():
-                self.on_event(event)
-            self.on_loop()
-            if not self.running:
-                break
-            self.on_render()
+        self.engine.run(observer=self.on_step)
         self.on_cleanup()
 
     def get_high_score(self):
@@ -273,31 +173,222 @@ def save_object(obj, filename):
         pickle.dump(obj, output, pickle.HIGHEST_PROTOCOL)
 
 
-def eval_genomes(genomes, config):
-    return Training_app(genomes, config).on_execute()
+def eval_genomes(genomes, config, render=True, run_seed=None, vectorized=False,
+                 profiler=None, schedule=None, cache=None, display_rate=30,
+                 render_every=1):
+    if schedule is None:
+        schedule = Episode_schedule()
+
+    # The vectorized engine has no snakes to draw
+    if vectorized:
+        render = False
+
+    # Only watch every render_every generations, the rest train flat out
+    generation = run_seed.generation if run_seed is not None else 0
+    if generation % render_every:
+        render = False
+
+    def play_games(games, seeds):
+        """Play every game not found in the cache together."""
+        engine = make_engine(games, config, WIDTH, HEIGHT, seeds=seeds,
+                             vectorized=vectorized, profiler=profiler)
+
+        # Only open a window when asked to and pygame is around
+        if render and import_pygame():
+            Training_app(engine, display_rate=display_rate).on_execute()
+            return engine.fitness
+        return engine.run()
+
+    def play(racing, first, last):
+        return play_episodes(racing, first, last, play_games,
+                             run_seed=run_seed, cache=cache,
+                             width=WIDTH, height=HEIGHT)
+
+    evaluate_episodes(genomes, play, schedule)
+    if profiler is not None and cache is not None:
+        profiler.count("cache_hits", cache.hits)
+        profiler.count("cache_misses", cache.misses)
+        cache.hits = cache.misses = 0
+
+
+def run(config_path, headless=False, workers=1, seed=None, vectorized=False,
+        profile=False, schedule=None, common_seeds=False, cache_size=None,
+        cache_file=None, checkpoint_dir=None, checkpoint_every=10,
+        resume=False, generations=400, display_rate=30, render_every=1,
+        replay_dir=None, replay_every=1):
+    checkpoint = None
+    if resume:
+        path = latest_checkpoint(checkpoint_dir)
+        if path is None:
+            raise FileNotFoundError(
+                f"No checkpoint to resume from in {checkpoint_dir}")
+        print(f"Resuming from {path}")
+
+        # The checkpoint brings back the run's seed and random state
+        checkpoint = load_checkpoint(path)
+        seed = checkpoint["seed"]
+        common_seeds = checkpoint["common_seeds"]
+        p = restore_population(checkpoint)
+        stats = checkpoint["stats"]
+    else:
+        config = neat.config.Config(neat.DefaultGenome,
+                                    neat.DefaultReproduction,
+                                    neat.DefaultSpeciesSet,
+                                    neat.DefaultStagnation, config_path)
+
+        # Every run is seeded so any of its games can be played again. The
+        # seed also drives neat's mutations, which come from the global
+        # random stream
+        if seed is None:
+            seed = random.SystemRandom().randrange(2 ** 32)
+        random.seed(seed)
+        p = neat.population.Population(config)
+        stats = neat.StatisticsReporter()
+
+    # A resumed run may already have trained as many generations as asked
+    generations = max(generations - p.generation, 0)
+    if generations == 0:
+        print(f"Already trained {p.generation} generations, nothing to run")
+        return
+
+    print(f"Run seed: {seed}")
+    run_seed = Run_seed(seed, common=common_seeds)
+    p.add_reporter(run_seed)
+
+    # Genomes carried over unchanged don't play their games again. Without
+    # common seeds every game is new, so the cache is only on by default
+    # when there is one or it is kept between runs
+    if cache_size is None:
+        cache_size = CACHE_SIZE if common_seeds or cache_file else 0
+    cache = None
+    if cache_size > 0:
+        cache = Fitness_cache(cache_size, path=cache_file)
+        if checkpoint is not None and checkpoint["cache"] is not None:
+            for key, fitness in checkpoint["cache"]:
+                cache.put(key, fitness)
+        p.add_reporter(cache)
 
+    p.add_reporter(neat.StdOutReporter(True))
+    p.add_reporter(stats)
 
-def run(config_path):
-    config = neat.config.Config(neat.DefaultGenome, neat.DefaultReproduction,
-                                neat.DefaultSpeciesSet, neat.DefaultStagnation,
-                                config_path)
+    # Keep the best game of a generation to watch later with Replay.py
+    if replay_dir is not None:
+        p.add_reporter(Replay_keeper(replay_dir, run_seed, WIDTH, HEIGHT,
+                                     every=replay_every))
 
-    p = neat.population.Population(config)
+    # Games played in worker processes only show up as the whole evaluation
+    profiler = None
+    if profile:
+        profiler = Profiler()
+        p.add_reporter(Profile_reporter(profiler))
 
-    p.add_reporter(neat.StdOutReporter(True))
-    stats = neat.StatisticsReporter()
-    p.add_reporter(stats)
+    # Save last, once the generation's other reporters are done
+    if checkpoint_dir is not None:
+        p.add_reporter(Checkpointer(checkpoint_dir, p, every=checkpoint_every,
+                                    stats=stats, cache=cache,
+                                    run_seed=run_seed))
 
     # Reset high score for training
-    with open("high_scores/high_score_neat_train.txt", "w") as file:
-        file.write("0")
-
-    winner = p.run(eval_genomes, 400)
+    if not resume:
+        with open("high_scores/high_score_neat_train.txt", "w") as file:
+            file.write("0")
+
+    # Games played in worker processes are never drawn
+    if workers > 1:
+        evaluator = Parallel_evaluator(workers, WIDTH, HEIGHT, run_seed=run_seed,
+                                       schedule=schedule, cache=cache)
+        try:
+            winner = p.run(evaluator.evaluate, generations)
+        finally:
+            evaluator.close()
+    else:
+        winner = p.run(partial(eval_genomes, render=not headless,
+                               run_seed=run_seed, vectorized=vectorized,
+                               profiler=profiler, schedule=schedule,
+                               cache=cache, display_rate=display_rate,
+                               render_every=render_every), generations)
 
     save_object(winner, "neat_snake_5.pickle")
+    save_network(Compiled_network.create(winner, p.config), "neat_snake_5.snet")
 
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Train NEAT snakes.")
+    parser.add_argument("--headless", action="store_true",
+                        help="train without opening a window")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="processes to evaluate genomes in, more than "
+                        "one trains headless")
+    parser.add_argument("--seed", type=int, default=None,
+                        help="seed the run so it can be reproduced, picked at "
+                        "random and printed if left out")
+    parser.add_argument("--display-rate", type=float, default=30,
+                        help="frames a second to draw the training games at, "
+                        "0 to draw every step")
+    parser.add_argument("--render-every", type=int, default=1,
+                        help="only draw every Nth generation")
+    parser.add_argument("--vectorized", action="store_true",
+                        help="step the whole population at once with NumPy, "
+                        "trains headless")
+    parser.add_argument("--profile", action="store_true",
+                        help="print where the time of each generation goes")
+    parser.add_argument("--episodes", type=int, default=1,
+                        help="games each genome plays for its fitness")
+    parser.add_argument("--aggregate", choices=AGGREGATES, default="mean",
+                        help="how the fitness of the games is combined")
+    parser.add_argument("--quantile", type=float, default=0.5,
+                        help="quantile of the games to score by, from 0 for "
+                        "the worst to 1 for the best")
+    parser.add_argument("--halving", action="store_true",
+                        help="stop playing the worse half of the genomes "
+                        "after each round of episodes")
+    parser.add_argument("--first-episodes", type=int, default=1,
+                        help="episodes every genome plays before halving")
+    parser.add_argument("--common-seeds", action="store_true",
+                        help="every genome plays the same games, so "
+                        "genomes carried over hit the fitness cache")
+    parser.add_argument("--cache-size", type=int,
+                        help="games to remember the fitness of, 0 to "
+                        f"turn the cache off, {CACHE_SIZE} by default with "
+                        "--common-seeds or --cache-file and off otherwise")
+    parser.add_argument("--cache-file",
+                        help="keep the fitness cache in this file between runs")
+    parser.add_argument("--generations", type=int, default=400,
+                        help="generations to train for in all")
+    parser.add_argument("--replay-dir",
+                        help="save a replay log of the best game of each "
+                        "generation to this directory")
+    parser.add_argument("--replay-every", type=int, default=1,
+                        help="generations between replay logs")
+    parser.add_argument("--checkpoint-dir",
+                        help="save checkpoints of the run to this directory")
+    parser.add_argument("--checkpoint-every", type=int, default=10,
+                        help="generations between checkpoints")
+    parser.add_argument("--resume", action="store_true",
+                        help="carry on from the latest checkpoint in "
+                        "--checkpoint-dir, with its seed and config")
+    args = parser.parse_args()
+    if args.resume and args.checkpoint_dir is None:
+        parser.error("--resume needs a --checkpoint-dir to resume from")
+    if args.replay_every < 1:
+        parser.error("--replay-every has to be at least 1")
+    if args.checkpoint_every < 1:
+        parser.error("--checkpoint-every has to be at least 1")
+    if args.render_every < 1:
+        parser.error("--render-every has to be at least 1")
+
+    schedule = Episode_schedule(args.episodes, aggregate=args.aggregate,
+                                quantile=args.quantile, halving=args.halving,
+                                first=args.first_episodes)
+
     local_dir = os.path.dirname(__file__)
     config_path = os.path.join(local_dir, "config-feedforward.txt")
-    run(config_path)
+    run(config_path, headless=args.headless, workers=args.workers,
+        seed=args.seed, vectorized=args.vectorized, profile=args.profile,
+        schedule=schedule, common_seeds=args.common_seeds,
+        cache_size=args.cache_size, cache_file=args.cache_file,
+        checkpoint_dir=args.checkpoint_dir,
+        checkpoint_every=args.checkpoint_every, resume=args.resume,
+        generations=args.generations, display_rate=args.display_rate,
+        render_every=args.render_every, replay_dir=args.replay_dir,
+        replay_every=args.replay_every)
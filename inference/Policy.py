@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+"""Play trained NEAT snakes with only the game and a compiled network.
+
+Nothing here imports neat-python or pygame, so serving snakes only needs
+NumPy and an exported network file, see Export_snakes.py.
+"""
+
+from random import Random
+
+from snakes.Actions import choose_action, choose_actions
+from snakes.Neat_snake import Neat_snake
+from snakes.Network_file import load_network
+from snakes.Game import Neat_game
+
+
+class Policy:
+    """
+    A class to house a trained network as a policy. An observation is the
+    16 inputs of Neat_snake.get_input, and an action is TURN_RIGHT,
+    STRAIGHT or TURN_LEFT, chosen the same way Neat_snake.move_snake does.
+    """
+
+    def __init__(self, network):
+        self.network = network
+
+    @classmethod
+    def load(cls, path):
+        """Load a policy from a network file."""
+        return cls(load_network(path))
+
+    def act(self, observation):
+        """Pick the action for one observation."""
+        return choose_action(self.network.activate(observation))
+
+    def act_batch(self, observations):
+        """Pick the action for each row of observations at once."""
+        return choose_actions(self.network.activate_batch(observations))
+
+    def move(self, snake):
+        """Point a Neat_snake the way the policy goes, like move_snake."""
+        snake.take_action(self.act(snake.get_input()))
+
+    def move_batch(self, snakes):
+        """Point many Neat_snakes with one batched network call."""
+        if not snakes:
+            return
+
+        actions = self.act_batch([snake.get_input() for snake in snakes])
+        for snake, action in zip(snakes, actions):
+            snake.take_action(action)
+
+
+def new_game(policy, width, height, seed=None, max_steps=None):
+    """Set up a headless game of a Neat_snake played by a policy."""
+    return Neat_game(Neat_snake(width, height, Random(seed)), policy.move,
+                max_steps=max_steps)
@@ -0,0 +1,365 @@
+#!/usr/bin/env python3
+
+"""Serve snake moves over a socket, batching requests that arrive together.
+
+Clients send one JSON request per line and get one JSON response per line.
+A request holds either the 16 inputs of Neat_snake.get_input:
+
+    {"id": 1, "observation": [...]}
+
+or the state of a game, which the server lays out on a snake of its own:
+
+    {"id": 2, "state": {"width": 50, "height": 35, "body": [[x, y], ...],
+                        "direction": [dx, dy], "food": [x, y]}}
+
+and gets back the move, {"id": 2, "action": 1, "direction": [dx, dy]}.
+A network only answers with an action to a bare observation. Send
+{"stats": true} for the server's throughput and latency.
+"""
+
+import json
+import asyncio
+from collections import deque
+from time import perf_counter
+
+from snakes.Actions import turn
+from snakes.Neat_snake import Neat_snake
+from snakes.A_star_snake import A_star_snake
+
+
+def percentiles(values, points=(50, 90, 99)):
+    """Nearest rank percentiles of a list of values."""
+    ordered = sorted(values)
+    if not ordered:
+        return {}
+
+    result = {f"p{point}": ordered[min(len(ordered) - 1,
+                                       len(ordered) * point // 100)]
+              for point in points}
+    result["max"] = ordered[-1]
+    result["mean"] = sum(ordered) / len(ordered)
+    return result
+
+
+# What the state of a game has to hold
+STATE_KEYS = ("width", "height", "body", "direction", "food")
+
+
+def is_int(value):
+    """Whether a JSON value is an integer, which booleans don't count as."""
+    return isinstance(value, int) and not isinstance(value, bool)
+
+
+def is_pair(value):
+    """Whether a JSON value is a pair of integers."""
+    return (isinstance(value, list) and len(value) == 2
+            and all(is_int(x) for x in value))
+
+
+def state_error(state):
+    """Why a client's game state can't be laid out, or None if it can."""
+    if not isinstance(state, dict):
+        return "A state has to be an object"
+    missing = [key for key in STATE_KEYS if key not in state]
+    if missing:
+        return f"The state is missing {', '.join(missing)}"
+    for key in ("width", "height"):
+        if not is_int(state[key]) or state[key] < 1:
+            return f"The state's {key} has to be a positive integer"
+    if not isinstance(state["body"], list) or not state["body"]:
+        return "The state's body has to be a list of cells"
+    if not all(is_pair(cell) for cell in state["body"]):
+        return "The state's body cells have to be pairs of integers"
+    for key in ("direction", "food"):
+        if not is_pair(state[key]):
+            return f"The state's {key} has to be a pair of integers"
+    return None
+
+
+def game_state(snake):
+    """The state of a snake's game, as a client sends it to lay out."""
+    return {"width": snake.width, "height": snake.height,
+            "body": list(snake.body), "direction": snake.direction,
+            "food": snake.food}
+
+
+def lay_out(snake, state):
+    """Set a snake to match the state of a client's game."""
+    snake.set_body([tuple(cell) for cell in state["body"]])
+    snake.direction = tuple(state["direction"])
+    snake.food = tuple(state["food"])
+
+
+def laid_out(snakes, kind, state):
+    """
+    The snake kept in snakes for the state's board size, made of kind if
+    there isn't one yet, laid out to match the state. If laying it out
+    fails the snake is dropped, so a bad state can't spoil later requests.
+    """
+    size = state["width"], state["height"]
+    if size not in snakes:
+        snakes[size] = kind(*size)
+    try:
+        lay_out(snakes[size], state)
+    except Exception:
+        del snakes[size]
+        raise
+    return snakes[size]
+
+
+class Network_brain:
+    """
+    A class to house a policy for the server. Every request of a batch is
+    turned into an observation and the policy picks all their moves in one
+    batched network call, the same moves Neat_snake.move_snake makes.
+    """
+
+    def __init__(self, policy):
+        self.policy = policy
+        # One snake per board size to lay the states out on
+        self.snakes = {}
+
+    def check(self, request):
+        """Why a request can't be decided, or None if it can."""
+        if "observation" not in request:
+            return state_error(request["state"])
+
+        observation = request["observation"]
+        count = self.policy.network.input_count
+        if not isinstance(observation, list) or len(observation) != count:
+            return f"An observation has to be a list of {count} numbers"
+        if not all(isinstance(x, (int, float)) for x in observation):
+            return f"An observation has to be a list of {count} numbers"
+        return None
+
+    def decide(self, requests):
+        """The responses to a batch of requests."""
+        observations = []
+        directions = []
+        for request in requests:
+            if "observation" in request:
+                observations.append(request["observation"])
+                directions.append(None)
+                continue
+
+            snake = laid_out(self.snakes, Neat_snake, request["state"])
+            observations.append(snake.get_input())
+            directions.append(snake.direction)
+
+        responses = []
+        for action, direction in zip(self.policy.act_batch(observations),
+                                     directions):
+            response = {"action": int(action)}
+            if direction is not None:
+                response["direction"] = turn(direction, action)
+            responses.append(response)
+
+        return responses
+
+
+class Planner_brain:
+    """
+    A class to house an A* planner for the server. Searches can't be
+    batched, so each state of a batch is planned in turn on a snake kept
+    for its board size, reusing the search buffers.
+    """
+
+    def __init__(self):
+        self.snakes = {}
+
+    def check(self, request):
+        """Why a request can't be decided, or None if it can."""
+        if "state" not in request:
+            return "The planner needs the state of a game"
+        return state_error(request["state"])
+
+    def decide(self, requests):
+        """The responses to a batch of requests."""
+        responses = []
+        for request in requests:
+            snake = laid_out(self.snakes, A_star_snake, request["state"])
+            snake.move_snake()
+            responses.append({"direction": snake.direction})
+
+        return responses
+
+
+class Server_stats:
+    """A class to house how many requests the server answered and how fast."""
+
+    def __init__(self, window=10000):
+        self.start = perf_counter()
+        self.requests = 0
+        self.batches = 0
+        # Only the latest latencies count towards the percentiles
+        self.latencies = deque(maxlen=window)
+
+    def record_batch(self, size):
+        self.batches += 1
+        self.requests += size
+
+    def record_latency(self, seconds):
+        self.latencies.append(seconds)
+
+    def summary(self):
+        elapsed = perf_counter() - self.start
+        return {
+            "requests": self.requests,
+            "batches": self.batches,
+            "mean_batch": self.requests / self.batches if self.batches else 0,
+            "requests_per_second": self.requests / elapsed if elapsed else 0,
+            "latency_ms": {key: value * 1e3 for key, value
+                           in percentiles(self.latencies).items()}
+        }
+
+
+class Batcher:
+    """
+    A class to house the queue of requests waiting on a brain. Requests
+    are gathered into a batch until it holds max_batch of them or the
+    first has waited max_wait seconds, then the whole batch is decided at
+    once in a worker thread so the server keeps reading requests. If the
+    batch fails its requests are decided one at a time, so only the bad
+    ones get an error.
+    """
+
+    def __init__(self, brain, max_batch=256, max_wait=0.002, stats=None):
+        self.brain = brain
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.stats = stats if stats is not None else Server_stats()
+        self.queue = asyncio.Queue()
+
+    async def submit(self, request):
+        """Queue a request and wait for its response."""
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((request, future))
+        return await future
+
+    async def gather(self):
+        """Wait for the next batch of requests."""
+        loop = asyncio.get_running_loop()
+        batch = [await self.queue.get()]
+        deadline = loop.time() + self.max_wait
+
+        while len(batch) < self.max_batch:
+            if not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+                continue
+            timeout = deadline - loop.time()
+            if timeout <= 0:
+                break
+            try:
+                batch.append(await asyncio.wait_for(self.queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+
+        return batch
+
+    def decide_each(self, requests):
+        """Decide requests one at a time, answering failures with the error."""
+        responses = []
+        for request in requests:
+            try:
+                responses.extend(self.brain.decide([request]))
+            except Exception as error:
+                responses.append({"error": str(error)})
+        return responses
+
+    async def run(self):
+        """Decide batches of requests until cancelled."""
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = await self.gather()
+            requests = [request for request, _ in batch]
+            try:
+                responses = await loop.run_in_executor(
+                    None, self.brain.decide, requests)
+            except Exception:
+                responses = await loop.run_in_executor(
+                    None, self.decide_each, requests)
+
+            self.stats.record_batch(len(batch))
+            for (_, future), response in zip(batch, responses):
+                if not future.done():
+                    future.set_result(response)
+
+
+class Policy_server:
+    """
+    A class to house the server. Each line a client sends is answered as
+    soon as its batch is decided, so a client can keep many requests in
+    flight on one connection and match the answers up by id.
+    """
+
+    def __init__(self, brain, host="127.0.0.1", port=8765, max_batch=256,
+                 max_wait=0.002):
+        self.host = host
+        self.port = port
+        self.brain = brain
+        self.stats = Server_stats()
+        self.batcher = Batcher(brain, max_batch=max_batch, max_wait=max_wait,
+                               stats=self.stats)
+
+    async def respond(self, line, writer):
+        """Answer one request line."""
+        start = perf_counter()
+        try:
+            request = json.loads(line)
+        except ValueError as error:
+            response = {"error": f"Bad request: {error}"}
+        else:
+            if not isinstance(request, dict):
+                response = {"error": "Requests have to be objects"}
+            elif request.get("stats"):
+                response = self.stats.summary()
+            elif "observation" in request or "state" in request:
+                error = self.brain.check(request)
+                if error is None:
+                    response = await self.batcher.submit(request)
+                    self.stats.record_latency(perf_counter() - start)
+                else:
+                    response = {"error": error}
+            else:
+                response = {"error": "Requests need an observation or a state"}
+            if isinstance(request, dict) and "id" in request:
+                response = dict(response, id=request["id"])
+
+        writer.write(json.dumps(response).encode() + b"\n")
+
+    async def handle(self, reader, writer):
+        """Read a client's requests until it hangs up."""
+        tasks = set()
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                task = asyncio.create_task(self.respond(line, writer))
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+            if tasks:
+                await asyncio.gather(*tasks)
+            await writer.drain()
+        finally:
+            writer.close()
+
+    async def serve(self, ready=None, report_every=None):
+        """
+        Serve until cancelled. ready, if given, is set once the server is
+        listening, and the stats are printed every report_every seconds.
+        """
+        batcher = asyncio.create_task(self.batcher.run())
+        server = await asyncio.start_server(self.handle, self.host, self.port)
+        if ready is not None:
+            ready.set()
+
+        try:
+            async with server:
+                if report_every is None:
+                    await server.serve_forever()
+                while True:
+                    await asyncio.sleep(report_every)
+                    print(json.dumps(self.stats.summary()), flush=True)
+        finally:
+            batcher.cancel()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+
+"""A* search over the cells of a board, with buffers reused between searches."""
+
+from functools import lru_cache
+from heapq import heappush, heappop
+
+
+@lru_cache(maxsize=None)
+def neighbor_table(width, height):
+    """
+    Get the ids of the cells next to each cell of a board, in the order down,
+    up, right, left. A cell's id is row * height + col.
+    """
+    table = []
+    for row in range(width):
+        for col in range(height):
+            cell = row * height + col
+            neighbors = []
+            if row < width - 1:
+                neighbors.append(cell + height)
+            if row > 0:
+                neighbors.append(cell - height)
+            if col < height - 1:
+                neighbors.append(cell + 1)
+            if col > 0:
+                neighbors.append(cell - 1)
+            table.append(tuple(neighbors))
+
+    return tuple(table)
+
+
+class A_star_search:
+    """
+    A class to house the buffers of an A* search. Scores and parents are
+    flat lists indexed by cell id. Instead of clearing them before every
+    search, each entry is stamped with the search that wrote it, and
+    entries with an old stamp count as unvisited.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.neighbors = neighbor_table(width, height)
+        self.rows = [cell // height for cell in range(width * height)]
+        self.cols = [cell % height for cell in range(width * height)]
+
+        self.g_score = [0] * (width * height)
+        self.came_from = [0] * (width * height)
+        self.visited = [0] * (width * height)
+        self.in_open = [0] * (width * height)
+        self.stamp = 0
+
+        # Count the nodes expanded over every search
+        self.expanded = 0
+
+    def search(self, start, goal, blocked):
+        """
+        Find a shortest path between two cell ids around the blocked cells,
+        a bytearray with a nonzero entry for each blocked cell id. Returns
+        the path from the goal back to the step after the start, or None if
+        the goal can't be reached.
+        """
+        self.stamp += 1
+        stamp = self.stamp
+        g_score = self.g_score
+        came_from = self.came_from
+        visited = self.visited
+        in_open = self.in_open
+        neighbors = self.neighbors
+        rows = self.rows
+        cols = self.cols
+        goal_row = rows[goal]
+        goal_col = cols[goal]
+
+        count = 0
+        open_set = [(0, count, start)]
+        g_score[start] = 0
+        visited[start] = stamp
+        in_open[start] = stamp
+
+        while open_set:
+            # Look at the current node
+            current = heappop(open_set)[2]
+            in_open[current] = 0
+            self.expanded += 1
+
+            # Walk the parents back to the start to build the path
+            if current == goal:
+                path = []
+                while current != start:
+                    path.append(current)
+                    current = came_from[current]
+                return path
+
+            # Consider the neighbors of the current node
+            temp_g_score = g_score[current] + 1
+            for neighbor in neighbors[current]:
+                if blocked[neighbor]:
+                    continue
+
+                # Update g score and path if necessary
+                if visited[neighbor] != stamp or temp_g_score < g_score[neighbor]:
+                    visited[neighbor] = stamp
+                    came_from[neighbor] = current
+                    g_score[neighbor] = temp_g_score
+                    if in_open[neighbor] != stamp:
+                        count += 1
+                        f_score = temp_g_score + \
+                            abs(rows[neighbor] - goal_row) + \
+                            abs(cols[neighbor] - goal_col)
+                        heappush(open_set, (f_score, count, neighbor))
+                        in_open[neighbor] = stamp
+
+        return None
@@ -2,118 +2,93 @@
 
 """A game of classic snake."""
 
-from math import sqrt
-from queue import PriorityQueue
-
 from .Simple_ai_snake import Simple_ai_snake
+from .A_star_search import A_star_search
 
 
 class A_star_snake(Simple_ai_snake):
-    """A class to house the snake."""
-
-    def __init__(self, width, height):
-        super().__init__(width, height)
+    """
+    A class to house the snake. By default it plans a fresh path to the food
+    every move. With reuse_path it keeps following its last path until the
+    food moves or the next step is blocked, so it plans about once per food.
+    """
+
+    def __init__(self, width, height, rng=None, reuse_path=False):
+        super().__init__(width, height, rng)
         self.render_path = True
+        self.reuse_path = reuse_path
+        self.path = []
+
+        # Keep a grid of the body by cell id for the search to check
+        self.search = A_star_search(width, height)
+        self.blocked = bytearray(width * height)
+        for cell in self.body:
+            self.blocked[self.cell_id(cell)] = 1
 
     def move_snake(self):
         """Move the snake."""
         head = self.body[0]
-        board = self.make_board()
-        count = 0
-        open_set = PriorityQueue()
-        open_set.put((0, count, head))
-        came_from = {}
-        g_score = {coord: float("inf") for row in board for coord in row}
-        g_score[head] = 0
-        f_score = {coord: float("inf") for row in board for coord in row}
-        f_score[head] = self.h(head, self.food)
-
-        open_set_hash = {head}
-
-        while not open_set.empty():
-            # Look at the current node
-            current = open_set.get()[2]
-            # Synchronize the hash with the PriorityQueue
-            open_set_hash.remove(current)
-
-            # Handle finding the shortest path
-            if current == self.food:
-                # Create a list of the coordinates in the path
-                self.path = []
-                while current in came_from:
-                    self.path.append(current)
-                    current = came_from[current]
-                # Get direction to move from difference of 2nd to last node in
-                # path and head
-                move = self.path[-1]
-                move = tuple(map(lambda x: x[1] - x[0], zip(head, move)))
-                if self.look_ahead(move):
-                    self.direction = move
-                return
-
-            # Consider the neighbors of the current node
-            for neighbor in self.get_neighbors(current):
-                # Handle rare KeyErrors from edge cases
-                try:
-                    temp_g_score = g_score[current] + 1
-
-                    # Update g score and path if necessary
-                    if temp_g_score < g_score[neighbor]:
-                        came_from[neighbor] = current
-                        g_score[neighbor] = temp_g_score
-                        f_score[neighbor] = temp_g_score + \
-                            self.h(neighbor, self.food)
-                        if neighbor not in open_set_hash:
-                            count += 1
-                            open_set.put((f_score[neighbor], count, neighbor))
-                            open_set_hash.add(neighbor)
-                # Handle edges cases without crashing
-                except KeyError:
-                    print("KEY ERROR")
-                    print("Neighbor:", neighbor)
-                    print("Head:", head)
-                    continue
-
-        # No path found so just move simply
-        move = self.simple_move_snake()
-        self.path = []
-        return
 
-    def get_neighbors(self, coord):
-        neighbors = []
-        row, col = coord
-        # Down
-        if row < self.width - 1 and (row + 1, col) not in self.body:
-            neighbors.append((row + 1, col))
+        # Drop the step taken since the last move
+        if self.path and self.path[-1] == head:
+            self.path.pop()
 
-        # Up
-        if row > 0 and (row - 1, col) not in self.body:
-            neighbors.append((row - 1, col))
+        if self.reuse_path and self.path_is_valid():
+            move = self.path[-1]
+            self.direction = (move[0] - head[0], move[1] - head[1])
+            return
 
-        # Right
-        if col < self.height - 1 and (row, col + 1) not in self.body:
-            neighbors.append((row, col + 1))
+        path = None
+        if head in self.board:
+            path = self.search.search(self.cell_id(head),
+                                      self.cell_id(self.food), self.blocked)
 
-        # Left
-        if col > 0 and (row, col - 1) not in self.body:
-            neighbors.append((row, col - 1))
+        # No path found so just move simply
+        if path is None:
+            move = self.simple_move_snake()
+            self.path = []
+            return
+
+        # Create a list of the coordinates in the path
+        cells = self.board.cells
+        self.path = [cells[cell] for cell in path]
+
+        # Get direction to move from difference of 2nd to last node in
+        # path and head
+        move = self.path[-1]
+        move = (move[0] - head[0], move[1] - head[1])
+        if self.look_ahead(move):
+            self.direction = move
+
+    def path_is_valid(self):
+        """
+        See if the last path still leads to the food. The path was planned
+        around the body, and since then the body has only followed it, so
+        the rest of the path stays clear as long as the next step is.
+        """
+        if not self.path or self.path[0] != self.food:
+            return False
 
-        return neighbors
+        head = self.body[0]
+        move = self.path[-1]
+        move = (move[0] - head[0], move[1] - head[1])
+        return abs(move[0]) + abs(move[1]) == 1 and self.look_ahead(move)
+
+    def cell_id(self, coord):
+        """Get the id of a cell on the board."""
+        return coord[0] * self.height + coord[1]
+
+    def occupy_cell(self, cell):
+        """Mark a cell as covered by the body."""
+        super().occupy_cell(cell)
+        if cell in self.board:
+            self.blocked[self.cell_id(cell)] = 1
+
+    def vacate_cell(self, cell):
+        """Mark a cell as no longer covered by the body."""
+        super().vacate_cell(cell)
+        if cell in self.board:
+            self.blocked[self.cell_id(cell)] = 0
 
     def simple_move_snake(self):
         super().move_snake()
-
-    def make_board(self):
-        board = []
-        for row in range(self.width):
-            board.append([])
-            for col in range(self.height):
-                board[row].append((row, col))
-        return board
-
-    @staticmethod
-    def h(p1, p2):
-        """Calculate the Manhattan distance between two points."""
-        x1, y1 = p1
-        x2, y2 = p2
-        return abs(x1 - x2) + abs(y1 - y2)
@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+
+"""The moves a NEAT snake can make, relative to the way it is going."""
+
+import numpy as np
+
+TURN_RIGHT = 0
+STRAIGHT = 1
+TURN_LEFT = 2
+
+
+def choose_action(output):
+    """
+    Pick a move from one network output, breaking ties right, then left,
+    then straight.
+    """
+    best = max(output)
+    if output[0] == best:
+        return TURN_RIGHT
+    if output[2] == best:
+        return TURN_LEFT
+    return STRAIGHT
+
+
+def choose_actions(outputs):
+    """
+    Pick a move from each row of network outputs, breaking ties the same
+    way Neat_snake.move_snake does: right, then left, then straight.
+    """
+    outputs = np.asarray(outputs, dtype=float)
+    best = outputs.max(axis=1)
+
+    return np.where(outputs[:, 0] == best, TURN_RIGHT,
+                    np.where(outputs[:, 2] == best, TURN_LEFT, STRAIGHT))
+
+
+def turn(direction, action):
+    """The direction a snake goes after taking a move."""
+    dx, dy = direction
+    if action == TURN_RIGHT:
+        return (-dy, -dx)
+    if action == TURN_LEFT:
+        return (dy, dx)
+    return direction
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+
+"""Many games of NEAT snake played at once with NumPy arrays."""
+
+from functools import lru_cache
+from random import Random
+import numpy as np
+
+from .Actions import TURN_RIGHT, STRAIGHT, TURN_LEFT, turn
+
+# Headings number the ways a snake can go, and standing still, from 0 to 8
+WEST = 1
+STILL = 4
+
+
+def heading(direction):
+    """The heading of a direction."""
+    return (direction[0] + 1) * 3 + direction[1] + 1
+
+
+def ray_table():
+    """
+    The right, diagonal right, forward, diagonal left and left directions
+    of a snake on each heading, shaped (9, 5, 2).
+    """
+    table = np.zeros((9, 5, 2), dtype=np.int64)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            total = dx + dy
+            table[heading((dx, dy))] = (
+                (-dy, -dx),
+                (-total if dx == 0 else dx, -total if dy == 0 else dy),
+                (dx, dy),
+                (total if dx == 0 else dx, total if dy == 0 else dy),
+                (dy, dx))
+    return table
+
+
+def turn_table():
+    """The heading each move takes a snake on each heading to, (9, 3)."""
+    table = np.zeros((9, 3), dtype=np.int64)
+    for dx in (-1, 0, 1):
+        for dy in (-1, 0, 1):
+            for action in (TURN_RIGHT, STRAIGHT, TURN_LEFT):
+                table[heading((dx, dy)), action] = heading(
+                    turn((dx, dy), action))
+    return table
+
+
+RAYS = ray_table()
+TURNS = turn_table()
+
+
+@lru_cache(maxsize=None)
+def wall_table(width, height):
+    """
+    How many cells lie between each cell and the wall along each ray of a
+    snake on each heading, as in Board.wall_distance, shaped (9, W, H, 5).
+    """
+    x = np.arange(width)[:, None, None]
+    y = np.arange(height)[None, :, None]
+    dx = RAYS[:, None, None, :, 0]
+    dy = RAYS[:, None, None, :, 1]
+    far = width + height
+    across = np.where(dx > 0, width - 1 - x, np.where(dx < 0, x, far))
+    down = np.where(dy > 0, height - 1 - y, np.where(dy < 0, y, far))
+    # Standing still casts no rays
+    return np.where((dx == 0) & (dy == 0), 0, np.minimum(across, down))
+
+
+@lru_cache(maxsize=None)
+def sight_table(width, height):
+    """
+    For a snake on each heading with the food at each offset from its
+    head, which of its rays the food lies straight along and whether the
+    snake is moving to the food, shaped (9, 2W - 1, 2H - 1, 6). The offset
+    (dx, dy) is found at (dx + W - 1, dy + H - 1).
+    """
+    dx = np.arange(1 - width, width)[None, :, None, None]
+    dy = np.arange(1 - height, height)[None, None, :, None]
+    rx = RAYS[:, None, None, :, 0]
+    ry = RAYS[:, None, None, :, 1]
+    steps = np.where(rx != 0, dx * rx, dy * ry)
+    seen = (steps > 0) & (dx == steps * rx) & (dy == steps * ry)
+
+    fx = rx[..., 2]
+    fy = ry[..., 2]
+    moving = np.where(fx != 0, fx * dx[..., 0] > 0, fy * dy[..., 0] > 0)
+    return np.concatenate([seen, moving[..., None]], axis=3).astype(np.int64)
+
+
+class Batch_env:
+    """
+    A class to house a whole population of snakes. Each board is an array
+    holding the move on which the head last entered each cell, so the body
+    is the cells entered within the last length moves and nothing has to
+    be aged as the snake moves. Moving, growing and collisions are a few
+    array operations over the living snakes only, and the rays and the
+    food are looked up in tables by heading instead of walked. Observations
+    match Neat_snake.get_input.
+    """
+
+    def __init__(self, count, width, height, seeds=None):
+        self.count = count
+        self.width = width
+        self.height = height
+
+        # Each game draws its food from its own random stream
+        if seeds is None:
+            seeds = [None for _ in range(count)]
+        self.rngs = [Random(seed) for seed in seeds]
+
+        # Start with one segment at center of screen, facing west. Cells
+        # never entered are marked before the first move
+        self.entered = np.full((count, width, height), -1, dtype=np.int32)
+        self.head = np.tile(
+            np.array([width // 2, height // 2], dtype=np.int64), (count, 1))
+        self.entered[:, width // 2, height // 2] = 0
+        self.heading = np.full(count, WEST, dtype=np.int64)
+        self.length = np.ones(count, dtype=np.int64)
+        self.score = np.zeros(count, dtype=np.int64)
+        self.hunger = np.zeros(count, dtype=np.int64)
+        self.alive = np.ones(count, dtype=bool)
+
+        # Moves made, and the move on which each snake next gains a segment.
+        # A cell is body while it was entered after steps - length
+        self.steps = np.zeros(count, dtype=np.int64)
+        self.next_growth = np.full(count, -1, dtype=np.int64)
+        self.growths = [[] for _ in range(count)]
+
+        # How far a step along each ray moves through a flattened board
+        self.strides = RAYS[:, :, 0] * height + RAYS[:, :, 1]
+        self.walls = wall_table(width, height)
+        self.sight = sight_table(width, height)
+
+        self.food = np.zeros((count, 2), dtype=np.int64)
+        for x in range(count):
+            self.make_food(x)
+
+    @property
+    def direction(self):
+        """The way every snake is going, shaped (count, 2)."""
+        return RAYS[self.heading, 2]
+
+    def make_food(self, x):
+        """
+        Place the food of a snake on a cell its body isn't on, drawn the
+        same way as Free_cells.sample.
+        """
+        rng = self.rngs[x]
+        size = self.width * self.height
+        free = self.entered[x] <= self.steps[x] - self.length[x]
+        row_counts = free.sum(axis=1)
+        free_count = int(row_counts.sum())
+        if free_count == 0:
+            return False
+
+        if free_count * 4 >= size:
+            while True:
+                cell = divmod(rng.randrange(size), self.height)
+                if free[cell]:
+                    self.food[x] = cell
+                    return True
+
+        # Count the free cells off along the rows, then along the row
+        n = rng.randrange(free_count)
+        ends = np.cumsum(row_counts)
+        row = int(np.searchsorted(ends, n, side="right"))
+        n -= int(ends[row] - row_counts[row])
+        self.food[x] = (row, int(np.flatnonzero(free[row])[n]))
+        return True
+
+    def observe(self):
+        """
+        The 16 network inputs of every snake, shaped (count, 16). Only the
+        rows of living snakes are filled in.
+        """
+        inputs = np.zeros((self.count, 16), dtype=np.int64)
+        rows = np.flatnonzero(self.alive)
+        if not len(rows):
+            return inputs
+
+        codes = self.heading[rows]
+        x = self.head[rows, 0]
+        y = self.head[rows, 1]
+
+        # Each ray runs to the wall unless the body is in the way. Every
+        # cell up to the wall is looked up at once and the ray stops at the
+        # first one on the body, or just past the wall
+        walls = self.walls[codes, x, y]
+        steps = np.arange(1, int(walls.max()) + 2)
+        start = (rows * self.width + x) * self.height + y
+        cells = start[:, None, None] + self.strides[codes][:, :, None] * steps
+        on_board = steps <= walls[:, :, None]
+        tail = (self.steps[rows] - self.length[rows])[:, None, None]
+        stop = ~on_board | (
+            self.entered.ravel()[np.where(on_board, cells, 0)] > tail)
+        barriers = stop.argmax(axis=2)
+
+        # Whether the food lies along each ray and the snake is moving to it
+        food = self.food[rows]
+        sight = self.sight[codes, food[:, 0] - x + self.width - 1,
+                           food[:, 1] - y + self.height - 1]
+
+        inputs[rows] = np.concatenate(
+            [barriers, sight[:, :5], barriers == 0, sight[:, 5:]], axis=1)
+        return inputs
+
+    def step(self, actions):
+        """
+        Turn and move every living snake, in the order the training loop
+        does it. Returns boolean arrays of the snakes that ate, starved and
+        crashed on this move.
+        """
+        ate = np.zeros(self.count, dtype=bool)
+        starved = np.zeros(self.count, dtype=bool)
+        crashed = np.zeros(self.count, dtype=bool)
+        rows = np.flatnonzero(self.alive)
+        if not len(rows):
+            return ate, starved, crashed
+
+        # Turn the snakes
+        self.hunger[rows] += 1
+        codes = TURNS[self.heading[rows], np.asarray(actions)[rows]]
+        self.heading[rows] = codes
+
+        # A snake grows by keeping its tail for a move
+        self.steps[rows] += 1
+        growing = rows[self.steps[rows] == self.next_growth[rows]]
+        self.length[growing] += 1
+        for x in growing:
+            growths = self.growths[x]
+            growths.pop(0)
+            self.next_growth[x] = growths[0] if growths else -1
+
+        # Move the heads forward
+        head = self.head[rows] + RAYS[codes, 2]
+        self.head[rows] = head
+        x = head[:, 0]
+        y = head[:, 1]
+        inside = (x >= 0) & (x < self.width) & (y >= 0) & (y < self.height)
+        index = rows[inside]
+        x = x[inside]
+        y = y[inside]
+        steps = self.steps[index]
+        hit = np.zeros(len(rows), dtype=bool)
+        hit[inside] = self.entered[index, x, y] > steps - self.length[index]
+        self.entered[index, x, y] = steps
+
+        # Starving is checked before crashing
+        length = self.length[rows]
+        hungry = self.hunger[rows] >= length * 75
+        lost = hungry | ~inside | hit
+        starved[rows] = hungry
+        crashed[rows] = lost & ~hungry
+        self.alive[rows] = ~lost
+        self.heading[rows[lost]] = STILL
+
+        # Eat the food and queue a new segment
+        ate[rows] = ~lost & (head == self.food[rows]).all(axis=1)
+        for x in np.flatnonzero(ate):
+            self.score[x] += 1
+            self.hunger[x] = 0
+            self.growths[x].append(self.steps[x] + self.length[x])
+            if self.next_growth[x] < 0:
+                self.next_growth[x] = self.growths[x][0]
+            # A full board leaves nowhere to put food so the game ends
+            if not self.make_food(x):
+                self.alive[x] = False
+                self.heading[x] = STILL
+
+        return ate, starved, crashed
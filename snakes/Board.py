@@ -0,0 +1,63 @@
+#!/usr/bin/env python3
+
+"""The board a game of snake is played on."""
+
+from functools import lru_cache
+
+
+class Board:
+    """
+    A class to house the cells of a board. Checking if a cell is on the
+    board takes constant time, and iterating gives the cells row by row.
+    """
+
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+        self.cells = tuple((row, col) for row in range(width)
+                           for col in range(height))
+        # Position of each cell in cells, shared by every Free_cells
+        self.index = {cell: x for x, cell in enumerate(self.cells)}
+        # Tables of how far each cell is from the wall, one per direction
+        self.wall_distances = {}
+
+    def __contains__(self, coord):
+        x, y = coord
+        return 0 <= x < self.width and 0 <= y < self.height
+
+    def __iter__(self):
+        return iter(self.cells)
+
+    def __len__(self):
+        return self.width * self.height
+
+    def wall_distance(self, direction):
+        """
+        Get the table of how many cells lie between each cell and the wall
+        when looking in a direction. Tables are built the first time they
+        are asked for.
+        """
+        table = self.wall_distances.get(direction)
+        if table is None:
+            dx, dy = direction
+            table = {}
+            for x, y in self.cells:
+                steps = []
+                if dx > 0:
+                    steps.append(self.width - 1 - x)
+                elif dx < 0:
+                    steps.append(x)
+                if dy > 0:
+                    steps.append(self.height - 1 - y)
+                elif dy < 0:
+                    steps.append(y)
+                table[(x, y)] = min(steps)
+            self.wall_distances[direction] = table
+
+        return table
+
+
+@lru_cache(maxsize=None)
+def get_board(width, height):
+    """Get the board of a size, shared by every snake playing on it."""
+    return Board(width, height)
@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+
+"""NEAT feed forward networks compiled to NumPy matrix multiplies."""
+
+import numpy as np
+
+# Activation and aggregation functions by id, matching neat-python's
+ACTIVATIONS = ('identity', 'sigmoid', 'tanh', 'relu', 'sin', 'gauss',
+               'softplus', 'clamped', 'inv', 'log', 'exp', 'abs', 'hat',
+               'square', 'cube')
+AGGREGATIONS = ('sum', 'mean')
+
+
+def inverse(z):
+    """1 / z, with 0 where neat-python's inv would divide by zero."""
+    return np.divide(1.0, z, out=np.zeros_like(z), where=z != 0.0)
+
+
+ACTIVATION_FUNCTIONS = (
+    lambda z: z,
+    lambda z: 1.0 / (1.0 + np.exp(-np.clip(5.0 * z, -60.0, 60.0))),
+    lambda z: np.tanh(np.clip(2.5 * z, -60.0, 60.0)),
+    lambda z: np.where(z > 0.0, z, 0.0),
+    lambda z: np.sin(np.clip(5.0 * z, -60.0, 60.0)),
+    lambda z: np.exp(-5.0 * np.clip(z, -3.4, 3.4) ** 2),
+    lambda z: 0.2 * np.log(1 + np.exp(np.clip(5.0 * z, -60.0, 60.0))),
+    lambda z: np.clip(z, -1.0, 1.0),
+    inverse,
+    lambda z: np.log(np.maximum(1e-7, z)),
+    lambda z: np.exp(np.clip(z, -60.0, 60.0)),
+    np.abs,
+    lambda z: np.maximum(0.0, 1 - np.abs(z)),
+    lambda z: z ** 2,
+    lambda z: z ** 3
+)
+
+
+def activation_masks(activation):
+    """Pair each activation id used in an array with where it is used."""
+    return [(x, activation == x) for x in np.unique(activation)]
+
+
+def apply_activations(z, masks):
+    """Run each value of z through the activation function of its node."""
+    if len(masks) == 1:
+        return ACTIVATION_FUNCTIONS[masks[0][0]](z)
+
+    out = np.empty_like(z)
+    for x, mask in masks:
+        mask = np.broadcast_to(mask, z.shape)
+        out[mask] = ACTIVATION_FUNCTIONS[x](z[mask])
+    return out
+
+
+class Compiled_network:
+    """
+    A class to house a NEAT feed forward network as flat arrays. Values
+    live in slots: the inputs first, then a slot that is always zero for
+    outputs nothing reaches, then one slot per node in evaluation order.
+    Each layer of nodes is a single matrix multiply over all the slots.
+    """
+
+    def __init__(self, input_count, output_slots, layer_sizes, bias, response,
+                 activation, aggregation, link_offsets, link_sources,
+                 link_weights):
+        self.input_count = int(input_count)
+        self.output_slots = np.asarray(output_slots, dtype=np.int64)
+        self.layer_sizes = np.asarray(layer_sizes, dtype=np.int64)
+        self.bias = np.asarray(bias, dtype=np.float64)
+        self.response = np.asarray(response, dtype=np.float64)
+        self.activation = np.asarray(activation, dtype=np.int64)
+        self.aggregation = np.asarray(aggregation, dtype=np.int64)
+        self.link_offsets = np.asarray(link_offsets, dtype=np.int64)
+        self.link_sources = np.asarray(link_sources, dtype=np.int64)
+        self.link_weights = np.asarray(link_weights, dtype=np.float64)
+        self.slot_count = self.input_count + 1 + len(self.bias)
+
+        # Build the dense weights of each layer
+        self.layers = []
+        start = 0
+        for size in self.layer_sizes:
+            nodes = np.arange(start, start + size)
+            weights = np.zeros((size, self.slot_count))
+            counts = np.zeros(size)
+            for row, node in enumerate(nodes):
+                begin, end = self.link_offsets[node], self.link_offsets[node + 1]
+                np.add.at(weights[row], self.link_sources[begin:end],
+                          self.link_weights[begin:end])
+                counts[row] = end - begin
+            # Mean aggregation divides the sum by the number of links
+            scale = np.where(self.aggregation[nodes] == 1,
+                             1.0 / np.maximum(counts, 1), 1.0)
+            self.layers.append((
+                self.input_count + 1 + nodes,
+                weights * scale[:, None] * self.response[nodes][:, None],
+                self.bias[nodes],
+                activation_masks(self.activation[nodes])
+            ))
+            start += size
+
+    @classmethod
+    def create(cls, genome, config):
+        """Compile a genome the same way FeedForwardNetwork.create does."""
+        # neat is only needed to compile, not to run a compiled network
+        from neat.graphs import feed_forward_layers
+
+        genome_config = config.genome_config
+        connections = [cg.key for cg in genome.connections.values()
+                       if cg.enabled]
+        layers = feed_forward_layers(genome_config.input_keys,
+                                     genome_config.output_keys, connections)
+
+        slots = {key: x for x, key in enumerate(genome_config.input_keys)}
+        input_count = len(slots)
+        order = [node for layer in layers for node in sorted(layer)]
+        for x, node in enumerate(order):
+            slots[node] = input_count + 1 + x
+
+        bias, response, activation, aggregation = [], [], [], []
+        link_offsets, link_sources, link_weights = [0], [], []
+        for node in order:
+            ng = genome.nodes[node]
+            if ng.activation not in ACTIVATIONS:
+                raise ValueError(
+                    f"Can't compile activation function {ng.activation!r}")
+            if ng.aggregation not in AGGREGATIONS:
+                raise ValueError(
+                    f"Can't compile aggregation function {ng.aggregation!r}")
+            bias.append(ng.bias)
+            response.append(ng.response)
+            activation.append(ACTIVATIONS.index(ng.activation))
+            aggregation.append(AGGREGATIONS.index(ng.aggregation))
+            for inode, onode in connections:
+                if onode == node:
+                    link_sources.append(slots[inode])
+                    link_weights.append(genome.connections[inode, onode].weight)
+            link_offsets.append(len(link_sources))
+
+        # Outputs no path reaches read the zero slot
+        output_slots = [slots.get(key, input_count)
+                        for key in genome_config.output_keys]
+
+        return cls(input_count, output_slots, [len(layer) for layer in layers],
+                   bias, response, activation, aggregation, link_offsets,
+                   link_sources, link_weights)
+
+    def activate_batch(self, inputs):
+        """Activate the network on each row of inputs at once."""
+        inputs = np.asarray(inputs, dtype=np.float64)
+        values = np.zeros((len(inputs), self.slot_count))
+        values[:, :self.input_count] = inputs
+
+        for targets, weights, bias, masks in self.layers:
+            values[:, targets] = apply_activations(
+                bias + values @ weights.T, masks)
+
+        return values[:, self.output_slots]
+
+    def activate(self, inputs):
+        """Activate the network on one set of inputs, like FeedForwardNetwork."""
+        if len(inputs) != self.input_count:
+            raise RuntimeError(
+                f"Expected {self.input_count:n} inputs, got {len(inputs):n}")
+
+        return self.activate_batch([inputs])[0].tolist()
+
+
+class Network_stack:
+    """
+    A class to house the compiled networks of a generation, padded to the
+    same shape so every network is activated in one batched call. Padding
+    nodes write to a spare slot past the end that no output reads.
+    """
+
+    def __init__(self, networks):
+        self.count = len(networks)
+        self.input_count = networks[0].input_count
+        self.slot_count = max(network.slot_count for network in networks)
+        depth = max(len(network.layers) for network in networks)
+        output_count = len(networks[0].output_slots)
+
+        self.output_slots = np.zeros((self.count, output_count), dtype=np.int64)
+        self.layers = []
+        for layer in range(depth):
+            width = max([len(network.layers[layer][0]) for network in networks
+                         if layer < len(network.layers)] + [1])
+            targets = np.full((self.count, width), self.slot_count)
+            weights = np.zeros((self.count, width, self.slot_count))
+            bias = np.zeros((self.count, width))
+            activation = np.zeros((self.count, width), dtype=np.int64)
+            for x, network in enumerate(networks):
+                if layer >= len(network.layers):
+                    continue
+                slots, layer_weights, layer_bias, masks = network.layers[layer]
+                size = len(slots)
+                targets[x, :size] = slots
+                weights[x, :size, :network.slot_count] = layer_weights
+                bias[x, :size] = layer_bias
+                for y, mask in masks:
+                    activation[x, :size][mask] = y
+            self.layers.append((targets, weights, bias,
+                                activation_masks(activation)))
+
+        for x, network in enumerate(networks):
+            self.output_slots[x] = network.output_slots
+
+    def activate(self, inputs, rows=None):
+        """
+        Activate each network on its row of inputs. Pass rows to activate
+        only those networks, with one row of inputs for each.
+        """
+        inputs = np.asarray(inputs, dtype=np.float64)
+        if rows is None:
+            rows = np.arange(self.count)
+        values = np.zeros((len(rows), self.slot_count + 1))
+        values[:, :self.input_count] = inputs
+
+        for targets, weights, bias, masks in self.layers:
+            z = np.einsum('nks,ns->nk', weights[rows],
+                          values[:, :self.slot_count]) + bias[rows]
+            masks = [(x, mask[rows]) for x, mask in masks]
+            np.put_along_axis(values, targets[rows],
+                              apply_activations(z, masks), axis=1)
+
+        return np.take_along_axis(values, self.output_slots[rows], axis=1)
@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+
+"""The cells of a board that the snake isn't on."""
+
+
+def nth_free(row_counts, free, height, n):
+    """
+    The position of the nth free cell in the board's order, counted along
+    the rows of the board a row at a time, then along the row found.
+    """
+    for row, count in enumerate(row_counts):
+        if n < count:
+            break
+        n -= count
+
+    x = row * height
+    while True:
+        if free[x]:
+            if n == 0:
+                return x
+            n -= 1
+        x += 1
+
+
+class Free_cells:
+    """
+    A class to house the free cells of a board. Whether each cell is free
+    is kept in the order of the board's cells, along with how many are
+    free in each row of the board, so adding and removing a cell take
+    constant time. Drawing a random cell takes constant time while the
+    board is mostly free, and then at most a walk over the rows and along
+    one of them.
+    """
+
+    def __init__(self, board):
+        self.board = board
+        self.free = bytearray([1]) * len(board)
+        self.row_counts = [board.height] * board.width
+        self.count = len(board)
+
+    def __len__(self):
+        return self.count
+
+    def __contains__(self, cell):
+        x = self.board.index.get(cell)
+        return x is not None and self.free[x] == 1
+
+    def add(self, cell):
+        """Free a cell, ignoring cells already free or off the board."""
+        x = self.board.index.get(cell)
+        if x is None or self.free[x]:
+            return
+        self.free[x] = 1
+        self.row_counts[x // self.board.height] += 1
+        self.count += 1
+
+    def remove(self, cell):
+        """Take a cell, ignoring cells that aren't free."""
+        x = self.board.index.get(cell)
+        if x is None or not self.free[x]:
+            return
+        self.free[x] = 0
+        self.row_counts[x // self.board.height] -= 1
+        self.count -= 1
+
+    def sample(self, rng):
+        """
+        Draw a free cell uniformly at random, or None if there are none. The
+        draw only depends on which cells are free, not on the order they
+        were freed in, so Batch_env draws the same food from the same
+        random stream. While a quarter of the board is free, random cells
+        of the board are tried until a free one turns up, after that the
+        free cells are counted off in the board's order to the one picked.
+        """
+        if not self.count:
+            return None
+
+        cells = self.board.cells
+        if self.count * 4 >= len(cells):
+            while True:
+                x = rng.randrange(len(cells))
+                if self.free[x]:
+                    return cells[x]
+
+        return cells[nth_free(self.row_counts, self.free, self.board.height,
+                              rng.randrange(self.count))]
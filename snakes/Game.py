@@ -0,0 +1,153 @@
+#!/usr/bin/env python3
+
+"""A game of classic snake played without a window."""
+
+from time import perf_counter
+
+
+class Game:
+    """
+    A class to house a headless game. Each step follows App.on_loop: see if
+    the game is over, feed the snake, let the policy point the snake and
+    move the body. A policy is any callable that takes the snake and sets
+    its direction. Pass a training Profiler to time the policy and the move.
+    """
+
+    def __init__(self, snake, policy, max_steps=None, profiler=None):
+        self.running = True
+        self.snake = snake
+        self.policy = policy
+        self.max_steps = max_steps
+        self.profiler = profiler
+        self.steps = 0
+
+    def on_loop(self):
+        """Handle game logic each game loop."""
+        if not self.begin_step():
+            return
+
+        if self.profiler is None:
+            self.policy(self.snake)
+            self.end_step()
+        else:
+            start = perf_counter()
+            self.policy(self.snake)
+            decided = perf_counter()
+            self.end_step()
+            self.profiler.add_time("policy", decided - start)
+            self.profiler.add_time("update_body", perf_counter() - decided)
+
+    def begin_step(self):
+        """
+        See if the game is over and feed the snake, the part of a step
+        before the policy moves. Returns whether the game goes on.
+        """
+        snake = self.snake
+        if snake.check_lose_conditions():
+            self.running = False
+            return False
+
+        snake.check_food_eaten()
+        # The snake filled the board so there is no food left to chase
+        if snake.won:
+            self.running = False
+            return False
+
+        return True
+
+    def end_step(self):
+        """Move the body the way the policy pointed it."""
+        self.snake.update_body()
+
+        self.steps += 1
+        if self.max_steps is not None and self.steps >= self.max_steps:
+            self.running = False
+
+    def run(self):
+        """Play until the game is over and return the score."""
+        while self.running:
+            self.on_loop()
+
+        # A* snakes count the nodes their searches expanded
+        if self.profiler is not None and hasattr(self.snake, "search"):
+            self.profiler.count("a_star_expanded", self.snake.search.expanded)
+
+        return self.snake.score
+
+
+class Neat_game(Game):
+    """
+    A class to house a headless game of a Neat_snake. As in training, the
+    snake starves if it goes too long without eating, and eating resets
+    its hunger.
+    """
+
+    def begin_step(self):
+        snake = self.snake
+        if snake.starved():
+            self.running = False
+            return False
+
+        score = snake.score
+        if not super().begin_step():
+            return False
+        if snake.score != score:
+            snake.hunger = 0
+        return True
+
+
+def ai_policy(snake):
+    """Let a Simple_ai_snake or A_star_snake pick its own move."""
+    snake.move_snake()
+
+
+def network_policy(network):
+    """Steer a Neat_snake with a network."""
+    def policy(snake):
+        snake.move_snake(network)
+    return policy
+
+
+def player_policy(rng, turn_chance=0.1):
+    """
+    Stand in for a human player with a plain Snake: keep going, now and then
+    turn at random, and avoid running into anything when there is a way out.
+    """
+    def policy(snake):
+        head = snake.body[0]
+        dx, dy = snake.direction
+        if (dx, dy) == (0, 0):
+            moves = [(0, -1), (0, 1), (-1, 0), (1, 0)]
+            rng.shuffle(moves)
+        else:
+            turns = [(-dy, -dx), (dy, dx)]
+            rng.shuffle(turns)
+            if rng.random() < turn_chance:
+                moves = turns + [(dx, dy)]
+            else:
+                moves = [(dx, dy)] + turns
+
+        for move in moves:
+            cell = (head[0] + move[0], head[1] + move[1])
+            if cell in snake.board and cell not in snake.occupied:
+                snake.direction = move
+                return
+        snake.direction = moves[0]
+    return policy
+
+
+def lay_body(snake, length):
+    """
+    Stretch a snake to a length by laying its body back and forth across the
+    rows from the top left, with the head at the end moving on.
+    """
+    cells = []
+    for y in range(snake.height):
+        xs = range(snake.width) if y % 2 == 0 else range(snake.width - 1, -1, -1)
+        cells.extend((x, y) for x in xs)
+    cells = cells[:length]
+
+    snake.set_body(reversed(cells))
+    if length > 1:
+        head, neck = cells[-1], cells[-2]
+        snake.direction = (head[0] - neck[0], head[1] - neck[1])
@@ -1,155 +1,86 @@
 #!/usr/bin/env python3
 
-"""
-"""
+"""A game of classic snake played by a NEAT neural network."""
 
+from .Actions import choose_action, turn
 from .Simple_ai_snake import Simple_ai_snake
+from .Ray_index import Ray_index
 
 
 class Neat_snake(Simple_ai_snake):
     """A class to house the NEAT AI snake."""
 
-    def __init__(self, width, height):
-        super().__init__(width, height)
+    def __init__(self, width, height, rng=None):
+        super().__init__(width, height, rng)
         self.direction = (-1, 0)
         self.hunger = 0
         self.path = set()
         self.time_loop = 0
         self.alive = True
-        self.vision = []
+        # Keep the body sorted along every line for the rays to search
+        self.ray_index = Ray_index(self.body)
+        self.rays = None
+
+    def starved(self):
+        """See if the snake went too long without eating, as in training."""
+        return self.hunger >= len(self.body) * 75
 
     def move_snake(self, network):
+        self.turn(network.activate(self.get_input()))
+
+    def turn(self, output):
+        """Take the move a network output picks."""
+        self.take_action(choose_action(output))
+
+    def take_action(self, action):
+        """Turn right, go straight or turn left, a step closer to starving."""
         self.hunger += 1
-        output = network.activate(self.get_input())
-
-        # Move right
-        if output[0] == max(output):
-            self.direction = (-1 * self.direction[1], -1 * self.direction[0])
-        # Move left
-        elif output[2] == max(output):
-            self.direction = (self.direction[1], self.direction[0])
-        # Move straight
-        else:
-            pass
+        self.direction = turn(self.direction, action)
 
     def get_input(self):
+        """
+        Look out from the head in five directions relative to the way the
+        snake is going. Reports how far each ray gets before hitting the body
+        or a wall, which ray sees the food, which neighbouring cells are
+        deadly and whether the snake is heading towards the food.
+        """
+        head = self.body[0]
+
         # Relative directions
-        forward = self.direction
-        diag_right = tuple([-1 * sum(self.direction) if x == 0 else x
-                            for x in self.direction])
-        right = (-1 * self.direction[1], -1 * self.direction[0])
-        left = (self.direction[1], self.direction[0])
-        diag_left = tuple([sum(self.direction) if x == 0 else x
-                           for x in self.direction])
-
-        """# Absolute directions
-        barriers = {
-            (0, 1): 0,  # North
-            (1, 1): 0,  # Northeast
-            (1, 0): 0,  # East
-            (1, -1): 0,  # Southeast
-            (0, -1): 0,  # South
-            (-1, -1): 0,  # Southwest
-            (-1, 0): 0,  # West
-            (-1, 1): 0  # Northwest
-        }"""
-        barriers = {
-            right: 0,
-            diag_right: 0,
-            forward: 0,
-            diag_left: 0,
-            left: 0
-        }
-        self.vision = []
-        for direction in barriers:
-            pointer = self.body[0]
-            count = -1
-            while True:
-                count += 1
-                look_at = tuple(map(sum, zip(direction, pointer)))
-                pointer = look_at
-                self.vision.append(look_at)
-                if look_at in self.body:
-                    barriers[direction] = count
-                    self.vision = self.vision[:-1]
-                    break
-                if look_at not in self.board:
-                    barriers[direction] = count
-                    self.vision = self.vision[:-1]
-                    break
-        """# Normalize the barrier data and take the inverse
-        for direction, distance in barriers.items():
-            # Looking left or right
-            if self.direction[0] != 0:
-                barriers[direction] = 1 - (distance / self.width)
-            # Looking up or down
-            else:
-                barriers[direction] = 1 - (distance / self.height)"""
-
-        """dir_food = {
-            (0, 1): 0,  # North
-            (1, 1): 0,  # Northeast
-            (1, 0): 0,  # East
-            (1, -1): 0,  # Southeast
-            (0, -1): 0,  # South
-            (-1, -1): 0,  # Southwest
-            (-1, 0): 0,  # West
-            (-1, 1): 0  # Northwest
-        }"""
-        dir_food = {
-            right: 0,
-            diag_right: 0,
-            forward: 0,
-            diag_left: 0,
-            left: 0
-        }
-        for direction in dir_food:
-            pointer = self.body[0]
-            while True:
-                if sum(dir_food.values()) == 0:
-                    look_at = tuple(map(sum, zip(direction, pointer)))
-                    pointer = look_at
-                    if look_at == self.food:
-                        dir_food[direction] = 1
-                        break
-                    if look_at not in self.board:
-                        break
-                else:
-                    break
-
-        """warning = {
-            (0, 1): 0,  # North
-            (1, 1): 0,  # Northeast
-            (1, 0): 0,  # East
-            (1, -1): 0,  # Southeast
-            (0, -1): 0,  # South
-            (-1, -1): 0,  # Southwest
-            (-1, 0): 0,  # West
-            (-1, 1): 0  # Northwest
-        }"""
-        warning = {
-            right: 0,
-            diag_right: 0,
-            forward: 0,
-            diag_left: 0,
-            left: 0
-        }
-        for direction in warning:
-            look_at = tuple(map(sum, zip(direction, self.body[0])))
-            if look_at in self.body or look_at not in self.board:
-                warning[direction] = 1
-
-        """# Report the direction of the snake
-        snake_dir = {
-            (0, 1): 0,  # North
-            (1, 0): 0,  # East
-            (0, -1): 0,  # South
-            (-1, 0): 0  # West
-        }
-        for direction in snake_dir.keys():
-            if self.direction == direction:
-                snake_dir[direction] = 1
-                break"""
+        dx, dy = self.direction
+        directions = (
+            (-dy, -dx),  # Right
+            (-(dx + dy) if dx == 0 else dx,
+             -(dx + dy) if dy == 0 else dy),  # Diagonal right
+            (dx, dy),  # Forward
+            (dx + dy if dx == 0 else dx,
+             dx + dy if dy == 0 else dy),  # Diagonal left
+            (dy, dx)  # Left
+        )
+
+        # Count the free cells along each ray from the wall distance table,
+        # cut short by the nearest body segment in the way
+        barriers = []
+        for direction in directions:
+            count = self.board.wall_distance(direction).get(head, 0)
+            steps = self.ray_index.nearest(head, direction)
+            if steps is not None and steps - 1 < count:
+                count = steps - 1
+            barriers.append(count)
+        self.rays = (head, directions, barriers)
+
+        # The food is seen by the ray it lies straight along
+        dir_food = [0, 0, 0, 0, 0]
+        food_x = self.food[0] - head[0]
+        food_y = self.food[1] - head[1]
+        for x, (ray_x, ray_y) in enumerate(directions):
+            steps = food_x * ray_x if ray_x != 0 else food_y * ray_y
+            if steps > 0 and food_x == steps * ray_x and food_y == steps * ray_y:
+                dir_food[x] = 1
+                break
+
+        # Warn of the neighbouring cells a ray can't get past
+        warning = [1 if count == 0 else 0 for count in barriers]
 
         # Report if the snake is moving to the food
         moving_to_food = None
@@ -166,19 +97,31 @@ class Neat_snake(Simple_ai_snake):
             else:
                 moving_to_food = 0
 
-        """# Order inputs so the info for vision directions are side by side
-        inputs = []
-        for i in zip(list(dir_food.values()), list(warning.values())):
-            inputs.append(i[0])
-            inputs.append(i[1])
-        inputs = inputs + list(snake_dir.values()) + [moving_to_food]"""
-
-        inputs = list(barriers.values()) + \
-            list(dir_food.values()) + \
-            list(warning.values()) + [moving_to_food]
+        inputs = barriers + dir_food + warning + [moving_to_food]
 
         return inputs
 
+    @property
+    def vision(self):
+        """The cells each ray of the last input crossed, for drawing."""
+        if self.rays is None:
+            return []
+
+        head, directions, barriers = self.rays
+        return [(head[0] + ray_x * step, head[1] + ray_y * step)
+                for (ray_x, ray_y), count in zip(directions, barriers)
+                for step in range(1, count + 1)]
+
+    def occupy_cell(self, cell):
+        """Mark a cell as covered by the body."""
+        super().occupy_cell(cell)
+        self.ray_index.add(cell)
+
+    def vacate_cell(self, cell):
+        """Mark a cell as no longer covered by the body."""
+        super().vacate_cell(cell)
+        self.ray_index.remove(cell)
+
     def check_food_eaten(self):
         """See if the snake head collides with the food."""
         head = self.body[0]
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+
+"""Save compiled networks to small binary files and load them back."""
+
+import struct
+import numpy as np
+
+from .Compiled_network import Compiled_network
+
+NETWORK_MAGIC = b"SNAKENET"
+NETWORK_VERSION = 1
+NETWORK_SUFFIX = ".snet"
+
+# Magic, version, then the input, output, node, layer and link counts
+HEADER = struct.Struct("<8s6I")
+
+
+def array_layout(input_count, output_count, node_count, layer_count,
+                 link_count):
+    """The name, type and length of each array in a file, in file order."""
+    return (
+        ("output_slots", np.int32, output_count),
+        ("layer_sizes", np.int32, layer_count),
+        ("bias", np.float64, node_count),
+        ("response", np.float64, node_count),
+        ("activation", np.uint8, node_count),
+        ("aggregation", np.uint8, node_count),
+        ("link_offsets", np.int32, node_count + 1),
+        ("link_sources", np.int32, link_count),
+        ("link_weights", np.float64, link_count)
+    )
+
+
+def padding(size):
+    """Bytes to pad to the next multiple of 8, so every array is aligned."""
+    return -size % 8
+
+
+def save_network(network, path):
+    """
+    Write a compiled network to a file: a header, then each array of the
+    network in evaluation order, little endian.
+    """
+    counts = (network.input_count, len(network.output_slots),
+              len(network.bias), len(network.layer_sizes),
+              len(network.link_sources))
+
+    with open(path, "wb") as file:
+        file.write(HEADER.pack(NETWORK_MAGIC, NETWORK_VERSION, *counts))
+        file.write(bytes(padding(HEADER.size)))
+        for name, dtype, _ in array_layout(*counts):
+            data = np.ascontiguousarray(getattr(network, name),
+                                        dtype=np.dtype(dtype).newbyteorder("<"))
+            file.write(data.tobytes())
+            file.write(bytes(padding(data.nbytes)))
+
+
+def load_network(path):
+    """
+    Read a compiled network from a file. The arrays are read in whole, as
+    the network builds its layer matrices from them anyway.
+    """
+    data = np.fromfile(path, dtype=np.uint8)
+
+    if len(data) < HEADER.size:
+        raise ValueError(f"{path} is too short to be a network file")
+    magic, version, *counts = HEADER.unpack(data[:HEADER.size].tobytes())
+    if magic != NETWORK_MAGIC:
+        raise ValueError(f"{path} is not a network file")
+    if version != NETWORK_VERSION:
+        raise ValueError(f"Can't read network file version {version} "
+                         f"from {path}")
+
+    arrays = {}
+    offset = HEADER.size + padding(HEADER.size)
+    for name, dtype, length in array_layout(*counts):
+        dtype = np.dtype(dtype).newbyteorder("<")
+        size = dtype.itemsize * length
+        if offset + size > len(data):
+            raise ValueError(f"{path} ends before its {name} array")
+        arrays[name] = data[offset:offset + size].view(dtype)
+        offset += size + padding(size)
+
+    return Compiled_network(counts[0], **arrays)
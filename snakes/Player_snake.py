@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+
+"""A game of classic snake played with the arrow keys."""
+
+import pygame
+from pygame.locals import (
+    KEYDOWN,
+    K_UP,
+    K_DOWN,
+    K_LEFT,
+    K_RIGHT,
+    K_SPACE
+)
+
+from .Snake import Snake
+
+
+class Player_snake(Snake):
+    """A class to house a snake steered by a human player."""
+
+    def __init__(self, width, height, rng=None):
+        super().__init__(width, height, rng)
+
+    def move_snake(self, pressed_keys):
+        """Move the snake."""
+
+        # Check if the snake changes direction and don't allow back tracking
+        if pressed_keys[K_UP] and self.direction != (0, 1):
+            self.direction = (0, -1)
+        elif pressed_keys[K_DOWN] and self.direction != (0, -1):
+            self.direction = (0, 1)
+        elif pressed_keys[K_LEFT] and self.direction != (1, 0):
+            self.direction = (-1, 0)
+        elif pressed_keys[K_RIGHT] and self.direction != (-1, 0):
+            self.direction = (1, 0)
+        # Pause the game
+        elif pressed_keys[K_SPACE]:
+            pause = True
+            while pause:
+                for event in pygame.event.get():
+                    if event.type == KEYDOWN:
+                        if event.key != K_SPACE:
+                            pause = False
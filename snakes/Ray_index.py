@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+
+"""Find the nearest body segment along a straight line from a cell."""
+
+from bisect import bisect_left, bisect_right, insort
+from collections import defaultdict
+
+
+def line_of(cell, direction):
+    """
+    Name the line through a cell in a direction. Returns which family of
+    lines it belongs to, which line of the family, where the cell sits on
+    it and whether the direction walks up or down the line.
+    """
+    x, y = cell
+    dx, dy = direction
+    if dy == 0:
+        return 0, y, x, dx
+    if dx == 0:
+        return 1, x, y, dy
+    if dx == dy:
+        return 2, x - y, x, dx
+    return 3, x + y, x, dx
+
+
+class Ray_index:
+    """
+    A class to house the body cells sorted along every row, column and
+    diagonal. Adding or removing a cell touches four short sorted lists, and
+    the nearest cell along a ray is a binary search in one of them.
+    """
+
+    def __init__(self, cells=()):
+        self.lines = [defaultdict(list) for _ in range(4)]
+        for cell in cells:
+            self.add(cell)
+
+    def add(self, cell):
+        """Add a body cell to the lines through it."""
+        for family, direction in enumerate(((1, 0), (0, 1), (1, 1), (1, -1))):
+            _, key, position, _ = line_of(cell, direction)
+            insort(self.lines[family][key], position)
+
+    def remove(self, cell):
+        """Remove a body cell from the lines through it."""
+        for family, direction in enumerate(((1, 0), (0, 1), (1, 1), (1, -1))):
+            _, key, position, _ = line_of(cell, direction)
+            line = self.lines[family][key]
+            x = bisect_left(line, position)
+            if x < len(line) and line[x] == position:
+                del line[x]
+
+    def nearest(self, cell, direction):
+        """
+        Count the steps from a cell to the nearest body cell in a direction,
+        or None if nothing is in the way.
+        """
+        family, key, position, sign = line_of(cell, direction)
+        line = self.lines[family].get(key)
+        if not line:
+            return None
+
+        if sign > 0:
+            x = bisect_right(line, position)
+            if x < len(line):
+                return line[x] - position
+        else:
+            x = bisect_left(line, position) - 1
+            if x >= 0:
+                return position - line[x]
+
+        return None
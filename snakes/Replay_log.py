@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+
+"""Log the moves of a game in a few bits each and play them back.
+
+A game is fully decided by its moves and where its food turned up, so a
+log keeps the direction of every move in two bits and each food placed,
+never the random stream that placed it. Every so many moves a keyframe
+holds the whole body, so any move can be reached by replaying at most a
+keyframe's worth of moves.
+"""
+
+import struct
+from bisect import bisect_right
+
+from .Snake import Snake
+
+REPLAY_MAGIC = b"SNAKELOG"
+REPLAY_VERSION = 1
+REPLAY_SUFFIX = ".snlog"
+
+# Magic, version, width, height, keyframe interval, whether there is a
+# seed, the kind of snake, the seed, then the move, food and keyframe counts
+HEADER = struct.Struct("<8sHHHHB15sQIII")
+# The move it follows, score, head x and y, length and countdowns
+KEYFRAME = struct.Struct("<IIhhIH")
+
+# Moves by their two bit code
+DIRECTIONS = ((0, -1), (1, 0), (0, 1), (-1, 0))
+CODES = {direction: code for code, direction in enumerate(DIRECTIONS)}
+NO_FOOD = 0xFFFF
+
+
+def pack_codes(codes):
+    """Pack two bit codes four to a byte, the first in the low bits."""
+    data = bytearray((len(codes) + 3) // 4)
+    for x, code in enumerate(codes):
+        data[x >> 2] |= code << ((x & 3) * 2)
+    return bytes(data)
+
+
+def unpack_codes(data, count):
+    return [(data[x >> 2] >> ((x & 3) * 2)) & 3 for x in range(count)]
+
+
+def body_codes(body):
+    """The move from each segment of a body to the next, head to tail."""
+    cells = list(body)
+    return [CODES[(cells[x + 1][0] - cells[x][0], cells[x + 1][1] - cells[x][1])]
+            for x in range(len(cells) - 1)]
+
+
+def body_cells(head, codes):
+    cells = [head]
+    for code in codes:
+        dx, dy = DIRECTIONS[code]
+        cells.append((cells[-1][0] + dx, cells[-1][1] + dy))
+    return cells
+
+
+class Replay_recorder:
+    """
+    A class to house the log of a game as it is played. Call observe with
+    the snake once before the first move and after every step after it.
+    A step that doesn't move the snake, like one before a player starts,
+    isn't logged, and food is logged whenever it moves.
+    """
+
+    def __init__(self, width, height, seed=None, kind="", keyframe_every=256):
+        self.width = width
+        self.height = height
+        self.seed = seed
+        self.kind = kind
+        self.keyframe_every = keyframe_every
+
+        self.moves = []
+        self.foods = []
+        self.keyframes = []
+        self.head = None
+
+    def keyframe(self, snake):
+        self.keyframes.append((len(self.moves), snake.score, snake.body[0],
+                               body_codes(snake.body),
+                               list(snake.adding_segment_countdowns)))
+
+    def observe(self, snake):
+        """Log what changed since the last step."""
+        head = snake.body[0]
+        if self.head is None:
+            self.keyframe(snake)
+        elif head != self.head:
+            self.moves.append(CODES[(head[0] - self.head[0],
+                                     head[1] - self.head[1])])
+            if len(self.moves) % self.keyframe_every == 0:
+                self.keyframe(snake)
+        self.head = head
+
+        if not self.foods or snake.food != self.foods[-1]:
+            self.foods.append(snake.food)
+
+    def log(self):
+        """The log of the game so far."""
+        return Replay_log(self.width, self.height, self.moves, self.foods,
+                          self.keyframes, seed=self.seed, kind=self.kind,
+                          keyframe_every=self.keyframe_every)
+
+    def save(self, path):
+        self.log().save(path)
+
+
+class Replay_log:
+    """
+    A class to house a logged game. snake_at sets up a snake as it was
+    after any number of moves from the keyframe before it, and advance
+    moves one on from there.
+    """
+
+    def __init__(self, width, height, moves, foods, keyframes, seed=None,
+                 kind="", keyframe_every=256):
+        self.width = width
+        self.height = height
+        self.moves = moves
+        self.foods = foods
+        self.keyframes = keyframes
+        self.seed = seed
+        self.kind = kind
+        self.keyframe_every = keyframe_every
+        self.keyframe_moves = [keyframe[0] for keyframe in keyframes]
+
+    def __len__(self):
+        return len(self.moves)
+
+    def eat(self, snake):
+        """Eat the food under the head, if the game went on to eat it."""
+        if snake.body[0] == snake.food and len(self.foods) > snake.score + 1:
+            snake.score += 1
+            snake.adding_segment_countdowns.append(len(snake.body))
+            snake.food = self.foods[snake.score]
+            snake.won = snake.food is None
+
+    def snake_at(self, move):
+        """A snake as it was after a number of moves."""
+        move = max(0, min(move, len(self.moves)))
+        keyframe = self.keyframes[bisect_right(self.keyframe_moves, move) - 1]
+        start, score, head, codes, countdowns = keyframe
+
+        snake = Snake(self.width, self.height)
+        snake.set_body(body_cells(head, codes))
+        # The food can be under the head, about to be eaten
+        snake.food = self.foods[score]
+        snake.score = score
+        snake.adding_segment_countdowns = list(countdowns)
+        snake.won = snake.food is None
+        if start:
+            snake.direction = DIRECTIONS[self.moves[start - 1]]
+        self.eat(snake)
+
+        for x in range(start, move):
+            self.advance(snake, x)
+        return snake
+
+    def advance(self, snake, move):
+        """Make a move on a snake that has made the moves before it."""
+        snake.direction = DIRECTIONS[self.moves[move]]
+        snake.update_body()
+        self.eat(snake)
+
+    def to_bytes(self):
+        width = self.width
+        data = bytearray(HEADER.pack(
+            REPLAY_MAGIC, REPLAY_VERSION, self.width, self.height,
+            self.keyframe_every, self.seed is not None, self.kind.encode(),
+            self.seed or 0, len(self.moves), len(self.foods),
+            len(self.keyframes)))
+        data += pack_codes(self.moves)
+        data += struct.pack(f"<{len(self.foods)}H", *(
+            NO_FOOD if food is None else food[1] * width + food[0]
+            for food in self.foods))
+        for start, score, head, codes, countdowns in self.keyframes:
+            data += KEYFRAME.pack(start, score, head[0], head[1],
+                                  len(codes) + 1, len(countdowns))
+            data += struct.pack(f"<{len(countdowns)}I", *countdowns)
+            data += pack_codes(codes)
+        return bytes(data)
+
+    @classmethod
+    def from_bytes(cls, data, name="replay log"):
+        if len(data) < HEADER.size:
+            raise ValueError(f"{name} is too short to be a replay log")
+        (magic, version, width, height, keyframe_every, has_seed, kind, seed,
+         move_count, food_count, keyframe_count) = HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC:
+            raise ValueError(f"{name} is not a replay log")
+        if version != REPLAY_VERSION:
+            raise ValueError(f"Can't read replay log version {version} "
+                             f"from {name}")
+
+        try:
+            offset = HEADER.size
+            size = (move_count + 3) // 4
+            moves = unpack_codes(data[offset:offset + size], move_count)
+            offset += size
+
+            foods = [None if cell == NO_FOOD else (cell % width, cell // width)
+                     for cell in struct.unpack_from(f"<{food_count}H", data,
+                                                    offset)]
+            offset += 2 * food_count
+
+            keyframes = []
+            for _ in range(keyframe_count):
+                start, score, x, y, length, countdown_count = \
+                    KEYFRAME.unpack_from(data, offset)
+                offset += KEYFRAME.size
+                countdowns = list(struct.unpack_from(f"<{countdown_count}I",
+                                                     data, offset))
+                offset += 4 * countdown_count
+                size = (length + 2) // 4
+                codes = unpack_codes(data[offset:offset + size], length - 1)
+                offset += size
+                keyframes.append((start, score, (x, y), codes, countdowns))
+        except (struct.error, IndexError):
+            raise ValueError(f"{name} ends before its last keyframe")
+
+        return cls(width, height, moves, foods, keyframes,
+                   seed=seed if has_seed else None,
+                   kind=kind.rstrip(b"\0").decode(),
+                   keyframe_every=keyframe_every)
+
+    def save(self, path):
+        with open(path, "wb") as file:
+            file.write(self.to_bytes())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as file:
+            return cls.from_bytes(file.read(), name=path)
@@ -13,8 +13,8 @@ class Simple_ai_snake(Snake):
     and takes the shortest path to the food.
     """
 
-    def __init__(self, width, height):
-        super().__init__(width, height)
+    def __init__(self, width, height, rng=None):
+        super().__init__(width, height, rng)
 
     def move_snake(self):
         """Move the snake and grow its body after eating food."""
@@ -52,8 +52,8 @@ class Simple_ai_snake(Snake):
     def look_ahead(self, direction):
         """Look ahead one space in a direction to see if it is a valid move."""
         head = self.body[0]
-        move = tuple(map(sum, zip(head, direction)))
-        if move in self.body or move not in self.board:
+        move = (head[0] + direction[0], head[1] + direction[1])
+        if move in self.occupied or move not in self.board:
             return False
         else:
             return True
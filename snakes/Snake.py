@@ -2,29 +2,32 @@
 
 """A game of classic snake."""
 
-from random import randint
-import pygame
-from pygame.locals import (
-    KEYDOWN,
-    K_UP,
-    K_DOWN,
-    K_LEFT,
-    K_RIGHT,
-    K_SPACE,
-    K_ESCAPE,
-    QUIT
-)
+from collections import deque
+from random import Random
+
+from .Board import get_board
+from .Free_cells import Free_cells
 
 
 class Snake:
     """A class to house the snake."""
 
-    def __init__(self, width, height):
+    def __init__(self, width, height, rng=None):
+        # Each game draws its food from its own random stream
+        self.rng = rng if rng is not None else Random()
         # Start with three segments at center of screen
         self.width = width
         self.height = height
-        self.body = [(width // 2,
-                      height // 2)]
+        self.board = get_board(width, height)
+        self.body = deque([(width // 2,
+                            height // 2)])
+        # Keep a set of the body cells for constant time collision checks
+        self.occupied = set(self.body)
+        self.bitten = False
+        # Keep the cells the snake isn't on to place food in constant time
+        self.free_cells = Free_cells(self.board)
+        self.free_cells.remove(self.body[0])
+        self.won = False
         self.food = self.make_food()
         self.score = 0
         # Start not moving
@@ -32,15 +35,12 @@ class Snake:
         # Init an empty list to countdown when to add segments
         self.adding_segment_countdowns = []
 
-        self.board = [(row, col) for row in range(self.width) for col in range(self.height)]
-
     def make_food(self):
-        """Make a snake snack! Place only where snake isn't."""
-        while True:
-            coords = (randint(0, self.width - 1),
-                      randint(0, self.height - 1))
-            if coords not in self.body:
-                break
+        """Make a snake snack! Place only where snake isn't. If the snake
+        fills the whole board there is nowhere left, so the game is won."""
+        coords = self.free_cells.sample(self.rng)
+        if coords is None:
+            self.won = True
 
         return coords
 
@@ -53,34 +53,12 @@ class Snake:
             self.score += 1  # Increment score
             self.adding_segment_countdowns.append(len(self.body))
 
-    def move_snake(self, pressed_keys):
-        """Move the snake."""
-
-        # Check if the snake changes direction and don't allow back tracking
-        if pressed_keys[K_UP] and self.direction != (0, 1):
-            self.direction = (0, -1)
-        elif pressed_keys[K_DOWN] and self.direction != (0, -1):
-            self.direction = (0, 1)
-        elif pressed_keys[K_LEFT] and self.direction != (1, 0):
-            self.direction = (-1, 0)
-        elif pressed_keys[K_RIGHT] and self.direction != (-1, 0):
-            self.direction = (1, 0)
-        # Pause the game
-        elif pressed_keys[K_SPACE]:
-            pause = True
-            while pause:
-                for event in pygame.event.get():
-                    if event.type == KEYDOWN:
-                        if event.key != K_SPACE:
-                            pause = False
-
     def update_body(self):
         """Add a segment in the direction of motion and take one away from the
         tail unless the snake ate food."""
         if self.direction != (0, 0):
-            # Move the snake forward by adding a segment in the direction of motion
-            self.body.insert(
-                0, tuple(map(sum, zip(self.body[0], self.direction))))
+            head = self.body[0]
+            move = (head[0] + self.direction[0], head[1] + self.direction[1])
 
             # Add a segment if food was eaten when it has passed the length of the
             # snake by counting down each instance of eating a food
@@ -91,7 +69,7 @@ class Snake:
 
                 # Remove the trailing segment only if the countdown hasn't finished
                 if self.adding_segment_countdowns[0] > 0:
-                    self.body.pop()
+                    self.vacate_cell(self.body.pop())
 
                 # Get rid off finished countdowns
                 if self.adding_segment_countdowns[0] == 0:
@@ -99,4 +77,41 @@ class Snake:
 
             # Remove the trailing segment if no countdowns
             else:
-                self.body.pop()
+                self.vacate_cell(self.body.pop())
+
+            # Move the snake forward by adding a segment in the direction of
+            # motion, noting if it lands on the rest of the body
+            self.bitten = move in self.occupied
+            self.body.appendleft(move)
+            self.occupy_cell(move)
+
+    def set_body(self, cells):
+        """Replace the body, head first, and move the food off of it."""
+        for cell in self.body:
+            self.vacate_cell(cell)
+        self.body = deque(cells)
+        for cell in self.body:
+            self.occupy_cell(cell)
+        self.bitten = False
+
+        if self.food is None or self.food in self.occupied:
+            self.food = self.make_food()
+
+    def occupy_cell(self, cell):
+        """Mark a cell as covered by the body."""
+        self.occupied.add(cell)
+        self.free_cells.remove(cell)
+
+    def vacate_cell(self, cell):
+        """Mark a cell as no longer covered by the body."""
+        self.occupied.discard(cell)
+        self.free_cells.add(cell)
+
+    def check_lose_conditions(self):
+        """See if the snake left the board or ran into itself."""
+        head = self.body[0]
+
+        if head not in self.board or self.bitten:
+            return True
+
+        return False
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+
+"""Check that Record_game's LZW streams decode the way a GIF reader does."""
+
+import unittest
+from random import Random
+
+from Record_game import lzw_codes, lzw_encode
+
+
+def lzw_decode(data, min_code_size):
+    """
+    Decode a GIF LZW stream, widening codes the way GIF readers do. Returns
+    the indices and each code read with its width, raising ValueError if a
+    code runs past the data.
+    """
+    clear = 1 << min_code_size
+    end = clear + 1
+    position = 0
+
+    def read(size):
+        nonlocal position
+        if position + size > len(data) * 8:
+            raise ValueError(f"Code at bit {position} runs past the data")
+        code = 0
+        for x in range(size):
+            bit = position + x
+            code |= ((data[bit >> 3] >> (bit & 7)) & 1) << x
+        position += size
+        return code
+
+    out = bytearray()
+    codes = []
+    table = []
+    size = min_code_size + 1
+    last = None
+    while True:
+        code = read(size)
+        codes.append((code, size))
+        if code == clear:
+            table = [bytes([x]) for x in range(clear)] + [b"", b""]
+            size = min_code_size + 1
+            last = None
+            continue
+        if code == end:
+            return bytes(out), codes
+        if last is None:
+            entry = table[code]
+        else:
+            if code < len(table):
+                entry = table[code]
+            elif code == len(table):
+                entry = last + last[:1]
+            else:
+                raise ValueError(f"Code {code} isn't in the table yet")
+            if len(table) < 4096:
+                table.append(last + entry[:1])
+            if len(table) == 1 << size and size < 12:
+                size += 1
+        out += entry
+        last = entry
+
+
+class Lzw_test(unittest.TestCase):
+    """Round trip data through lzw_encode and a GIF style decoder."""
+
+    def round_trip(self, data, min_code_size=8):
+        decoded, codes = lzw_decode(lzw_encode(data, min_code_size),
+                                    min_code_size)
+        self.assertEqual(decoded, data)
+        # Every code, the end code too, is as wide as the reader expects
+        self.assertEqual(codes, lzw_codes(data, min_code_size))
+
+    def test_random(self):
+        rng = Random(0)
+        for length in (1, 2, 255, 256, 1000, 5000, 20000):
+            self.round_trip(bytes(rng.randrange(256) for _ in range(length)))
+
+    def test_every_length(self):
+        # End the stream on every code, across every change of width and
+        # every reset of a full table
+        rng = Random(1)
+        data = bytes(rng.randrange(4) for _ in range(2500))
+        for length in range(1, len(data)):
+            self.round_trip(data[:length], 2)
+
+    def test_runs(self):
+        rng = Random(2)
+        data = bytearray()
+        while len(data) < 50000:
+            data += bytes([rng.choice((0, 1, 255))]) * rng.randrange(1, 300)
+        self.round_trip(bytes(data))
+
+
+if __name__ == "__main__":
+    unittest.main()
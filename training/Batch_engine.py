@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+
+"""Headless training of a generation with every game in one NumPy batch."""
+
+from time import perf_counter
+import numpy as np
+
+from snakes.Actions import choose_actions
+from snakes.Batch_env import Batch_env
+from snakes.Compiled_network import Network_stack
+
+
+class Batch_engine:
+    """
+    A class to house the games of a generation in a Batch_env. The compiled
+    networks are stacked so every living snake decides its move in one
+    batched call per step. Fitness is scored the same way as Neat_engine.
+    Pass a Profiler to time the phases of each step.
+    """
+
+    def __init__(self, nets, width, height, seeds=None, profiler=None):
+        self.running = True
+        self.profiler = profiler
+        self.nets = Network_stack(nets)
+        self.env = Batch_env(len(nets), width, height, seeds=seeds)
+        self.fitness = np.zeros(len(nets))
+
+    def on_loop(self):
+        """Move every living snake one step and score it."""
+        env = self.env
+        profiler = self.profiler
+        if profiler is not None:
+            start = perf_counter()
+
+        alive = env.alive.copy()
+        inputs = env.observe()
+        if profiler is not None:
+            observed = perf_counter()
+
+        outputs = np.zeros((env.count, 3))
+        rows = np.flatnonzero(alive)
+        outputs[rows] = self.nets.activate(inputs[rows], rows=rows)
+        if profiler is not None:
+            activated = perf_counter()
+
+        ate, starved, crashed = env.step(choose_actions(outputs))
+
+        if profiler is not None:
+            profiler.add_time("observe", observed - start)
+            profiler.add_time("activate", activated - observed)
+            profiler.add_time("step", perf_counter() - activated)
+            profiler.count("moves", len(rows))
+            profiler.count("ray_steps", int(inputs[rows, :5].sum()) + 5 * len(rows))
+
+        self.fitness[alive] -= 1.5
+        dead = starved | crashed
+        self.fitness[dead] -= 100 / env.length[dead]
+        self.fitness[ate] += 10
+
+        # Check if all snakes are dead
+        if not env.alive.any():
+            self.running = False
+
+    def run(self):
+        """Play until every snake is dead."""
+        while self.running:
+            self.on_loop()
+
+        return self.fitness.tolist()
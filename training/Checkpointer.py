@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+
+"""Save training runs as they go so they can be resumed."""
+
+import os
+import re
+import copy
+import gzip
+import pickle
+import random
+from itertools import count
+import neat
+from neat.reporting import BaseReporter
+
+CHECKPOINT_VERSION = 1
+CHECKPOINT_NAME = re.compile(r"checkpoint-(\d+)\.pkl\.gz$")
+
+
+class Checkpointer(BaseReporter):
+    """
+    A neat reporter to save a run to a directory every few generations:
+    the population, species, statistics, the global random state, the run
+    seed and the fitness cache. Each checkpoint is written to a temporary
+    file and renamed into place, so a run killed mid save leaves the last
+    checkpoint whole. Only the newest few checkpoints are kept.
+    """
+
+    def __init__(self, directory, population, every=10, keep=3, stats=None,
+                 cache=None, run_seed=None):
+        self.directory = directory
+        self.population = population
+        self.every = every
+        self.keep = keep
+        self.stats = stats
+        self.cache = cache
+        self.run_seed = run_seed
+        self.generation = None
+
+        os.makedirs(directory, exist_ok=True)
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def end_generation(self, config, population, species_set):
+        if (self.generation + 1) % self.every == 0:
+            self.save(config, population, species_set)
+
+    def save(self, config, population, species_set):
+        """Write a checkpoint to resume from after this generation."""
+        reproduction = self.population.reproduction
+
+        # Take the next genome key and put it back
+        next_key = next(reproduction.genome_indexer)
+        reproduction.genome_indexer = count(next_key)
+
+        # The reporters are rebuilt on resume, so leave them out
+        species_set = copy.copy(species_set)
+        species_set.reporters = None
+
+        data = {
+            "version": CHECKPOINT_VERSION,
+            "generation": self.generation + 1,
+            "config": config,
+            "population": population,
+            "species_set": species_set,
+            "best_genome": self.population.best_genome,
+            "next_genome_key": next_key,
+            "ancestors": reproduction.ancestors,
+            "stats": self.stats,
+            "random_state": random.getstate(),
+            "seed": self.run_seed.seed if self.run_seed is not None else None,
+            "common_seeds": (self.run_seed.common
+                             if self.run_seed is not None else False),
+            "cache": (list(self.cache.entries.items())
+                      if self.cache is not None else None)
+        }
+
+        path = os.path.join(self.directory,
+                            f"checkpoint-{self.generation + 1:05d}.pkl.gz")
+        temp_path = f"{path}.tmp"
+        with gzip.open(temp_path, "wb", compresslevel=5) as file:
+            pickle.dump(data, file, pickle.HIGHEST_PROTOCOL)
+        os.replace(temp_path, path)
+
+        for old_path in list_checkpoints(self.directory)[:-self.keep]:
+            os.remove(old_path)
+
+
+def list_checkpoints(directory):
+    """The checkpoints in a directory, oldest first."""
+    if not os.path.isdir(directory):
+        return []
+
+    found = []
+    for name in os.listdir(directory):
+        match = CHECKPOINT_NAME.match(name)
+        if match:
+            found.append((int(match.group(1)), os.path.join(directory, name)))
+
+    return [path for _, path in sorted(found)]
+
+
+def latest_checkpoint(directory):
+    """The newest checkpoint in a directory, or None if there are none."""
+    checkpoints = list_checkpoints(directory)
+    return checkpoints[-1] if checkpoints else None
+
+
+def load_checkpoint(path):
+    """Read a checkpoint and put the global random state back."""
+    with gzip.open(path, "rb") as file:
+        data = pickle.load(file)
+    if data.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"Can't resume from checkpoint version "
+                         f"{data.get('version')!r} in {path}")
+
+    random.setstate(data["random_state"])
+    return data
+
+
+def restore_population(data):
+    """Make a population that carries on from a loaded checkpoint."""
+    p = neat.population.Population(
+        data["config"],
+        initial_state=(data["population"], data["species_set"],
+                       data["generation"]))
+
+    p.species.reporters = p.reporters
+    p.best_genome = data["best_genome"]
+    p.reproduction.genome_indexer = count(data["next_genome_key"])
+    p.reproduction.ancestors = data["ancestors"]
+
+    return p
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+
+"""Score genomes over several games, dropping hopeless ones early."""
+
+from math import ceil
+
+AGGREGATES = ("mean", "min", "quantile")
+
+
+def aggregate_fitness(fitnesses, method="mean", quantile=0.5):
+    """
+    Combine the fitness of a genome's games into one. A quantile sits
+    between the worst game at 0 and the best at 1.
+    """
+    if method == "mean":
+        return sum(fitnesses) / len(fitnesses)
+    if method == "min":
+        return min(fitnesses)
+    if method == "quantile":
+        ordered = sorted(fitnesses)
+        position = quantile * (len(ordered) - 1)
+        below = int(position)
+        above = min(below + 1, len(ordered) - 1)
+        return ordered[below] + (ordered[above] - ordered[below]) * (position - below)
+
+    raise ValueError(f"Unknown fitness aggregate {method!r}")
+
+
+class Episode_schedule:
+    """
+    A class to house how many games, or episodes, each genome plays and
+    how they are scored. With halving, every genome plays the first few
+    episodes, then only the better half of the generation goes on to
+    twice as many, and so on until the best play all of them. Genomes
+    that stop early keep the score of the episodes they played.
+    """
+
+    def __init__(self, episodes=1, aggregate="mean", quantile=0.5,
+                 halving=False, first=1):
+        if episodes < 1:
+            raise ValueError("Genomes must play at least one episode")
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unknown fitness aggregate {aggregate!r}")
+        if not 0 <= quantile <= 1:
+            raise ValueError(f"Quantile {quantile} isn't between 0 and 1")
+
+        self.episodes = episodes
+        self.aggregate = aggregate
+        self.quantile = quantile
+        self.halving = halving
+        self.first = max(1, min(first, episodes))
+
+    def score(self, fitnesses):
+        """The fitness of a genome from the fitness of its episodes."""
+        return aggregate_fitness(fitnesses, self.aggregate, self.quantile)
+
+    def rounds(self):
+        """The episodes played in each round, as (first, last) pairs."""
+        if not self.halving:
+            return [(0, self.episodes)]
+
+        rounds = []
+        played = 0
+        target = self.first
+        while played < self.episodes:
+            rounds.append((played, target))
+            played = target
+            target = min(target * 2, self.episodes)
+
+        return rounds
+
+
+def evaluate_episodes(genomes, play, schedule):
+    """
+    Set the fitness of each genome from its episodes. play is called once
+    per round with the genomes still racing and the range of episodes to
+    play, and returns the fitness of each of those episodes per genome.
+    """
+    fitnesses = {key: [] for key, _ in genomes}
+    racing = list(genomes)
+
+    rounds = schedule.rounds()
+    for x, (first, last) in enumerate(rounds):
+        for (key, _), results in zip(racing, play(racing, first, last)):
+            fitnesses[key].extend(results)
+
+        # Only the better half goes on to the next round
+        if x < len(rounds) - 1:
+            racing.sort(key=lambda item: schedule.score(fitnesses[item[0]]),
+                        reverse=True)
+            racing = racing[:ceil(len(racing) / 2)]
+
+    for key, genome in genomes:
+        genome.fitness = schedule.score(fitnesses[key])
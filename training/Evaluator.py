@@ -0,0 +1,179 @@
+#!/usr/bin/env python3
+
+"""Evaluate the genomes of a generation across a pool of processes."""
+
+from concurrent.futures import ProcessPoolExecutor
+from time import perf_counter
+import hashlib
+import neat
+from neat.reporting import BaseReporter
+
+from snakes.Compiled_network import Compiled_network
+from .Neat_engine import Neat_engine
+from .Batch_engine import Batch_engine
+from .Episodes import Episode_schedule, evaluate_episodes
+
+
+def game_seed(seed, generation, genome_key, episode=0):
+    """
+    Seed for one game of a genome, or None for an unseeded game. The parts
+    are hashed so the seed is the same in every process and nearby games
+    don't get related streams.
+    """
+    if seed is None:
+        return None
+
+    key = f"{seed}:{generation}:{genome_key}:{episode}".encode()
+    return int.from_bytes(hashlib.blake2b(key, digest_size=8).digest(), "big")
+
+
+class Run_seed(BaseReporter):
+    """
+    A neat reporter to hand out the seeds of a run's games. It follows the
+    generation being evaluated, so a game is replayed exactly by its run
+    seed, generation, genome key and episode. With common seeds every
+    genome of every generation plays the same games, one per episode, so
+    genomes are compared on equal terms and an identical genome plays the
+    games it already played.
+    """
+
+    def __init__(self, seed, common=False):
+        self.seed = seed
+        self.common = common
+        self.generation = 0
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def game_seeds(self, genomes, first=0, last=1):
+        """
+        Seeds for the episodes from first up to last that each genome plays
+        this generation, all the episodes of a genome in a row.
+        """
+        if self.common:
+            return [game_seed(self.seed, 0, 0, episode)
+                    for _ in genomes for episode in range(first, last)]
+
+        return [game_seed(self.seed, self.generation, key, episode)
+                for key, _ in genomes for episode in range(first, last)]
+
+
+def make_engine(genomes, config, width, height, seeds=None, vectorized=False,
+                profiler=None):
+    """
+    Set up one game for each genome listed, each game seeded by its entry
+    in seeds. A genome listed more than once plays a game for each time.
+    The vectorized engine plays them all as one NumPy batch with compiled
+    networks. A profiler times building the networks and is handed on to
+    the engine.
+    """
+    if profiler is not None:
+        start = perf_counter()
+
+    if vectorized:
+        create = Compiled_network.create
+        engine_class = Batch_engine
+    else:
+        create = neat.nn.feed_forward.FeedForwardNetwork.create
+        engine_class = Neat_engine
+
+    # Every game of a genome shares its network
+    nets = {}
+    for key, g in genomes:
+        if key not in nets:
+            nets[key] = create(g, config)
+
+    if profiler is not None:
+        profiler.add_time("create_networks", perf_counter() - start)
+
+    return engine_class([nets[key] for key, _ in genomes], width, height,
+                        seeds=seeds, profiler=profiler)
+
+
+def split_episodes(fitnesses, episodes):
+    """Group the fitness of a run of games by genome, episodes at a time."""
+    return [list(fitnesses[x:x + episodes])
+            for x in range(0, len(fitnesses), episodes)]
+
+
+def play_episodes(racing, first, last, play_games, run_seed=None, cache=None,
+                  width=None, height=None):
+    """
+    Play the episodes from first up to last of each racing genome and
+    return their fitness per genome. Games found in the cache aren't
+    played again, the rest are handed to play_games together as lists of
+    genomes and seeds.
+    """
+    games = [(key, genome) for key, genome in racing
+             for _ in range(first, last)]
+    if run_seed is None:
+        seeds = [None for _ in games]
+    else:
+        seeds = run_seed.game_seeds(racing, first, last)
+
+    keys = [None for _ in games]
+    fitnesses = [None for _ in games]
+    if cache is not None:
+        for x, ((_, genome), seed) in enumerate(zip(games, seeds)):
+            keys[x] = cache.key(genome, seed, width, height)
+            if keys[x] is not None:
+                fitnesses[x] = cache.get(keys[x])
+
+    unplayed = [x for x, fitness in enumerate(fitnesses) if fitness is None]
+    if unplayed:
+        results = play_games([games[x] for x in unplayed],
+                             [seeds[x] for x in unplayed])
+        for x, fitness in zip(unplayed, results):
+            fitnesses[x] = fitness
+            if keys[x] is not None:
+                cache.put(keys[x], fitness)
+
+    return split_episodes(fitnesses, last - first)
+
+
+def evaluate_genome(genome, config, width, height, seed=None):
+    """Play a single headless game with a genome and return its fitness."""
+    net = neat.nn.feed_forward.FeedForwardNetwork.create(genome, config)
+    engine = Neat_engine([net], width, height, seeds=[seed])
+
+    return engine.run()[0]
+
+
+class Parallel_evaluator:
+    """
+    A class to house the process pool. Each game of a genome is played in
+    a worker, so with a run seed the fitness matches the sequential
+    evaluation. Games in the fitness cache, if any, aren't sent out.
+    """
+
+    def __init__(self, workers, width, height, run_seed=None, schedule=None,
+                 cache=None):
+        self.width = width
+        self.height = height
+        self.run_seed = run_seed
+        self.schedule = schedule if schedule is not None else Episode_schedule()
+        self.cache = cache
+        self.pool = ProcessPoolExecutor(max_workers=workers)
+
+    def play_games(self, games, seeds, config):
+        """Play a game with each genome in parallel."""
+        futures = [self.pool.submit(evaluate_genome, genome, config,
+                                    self.width, self.height, seed)
+                   for (_, genome), seed in zip(games, seeds)]
+
+        return [future.result() for future in futures]
+
+    def evaluate(self, genomes, config):
+        """Set the fitness of each genome, playing the games in parallel."""
+        def play(racing, first, last):
+            return play_episodes(
+                racing, first, last,
+                lambda games, seeds: self.play_games(games, seeds, config),
+                run_seed=self.run_seed, cache=self.cache,
+                width=self.width, height=self.height)
+
+        evaluate_episodes(genomes, play, self.schedule)
+
+    def close(self):
+        """Shut down the worker processes."""
+        self.pool.shutdown()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+
+"""Remember the fitness of games already played."""
+
+import os
+import json
+import hashlib
+from collections import OrderedDict
+from neat.reporting import BaseReporter
+
+CACHE_VERSION = 1
+
+
+def genome_hash(genome):
+    """
+    Hash everything about a genome that changes how it plays: its nodes'
+    bias, response, activation and aggregation and its enabled connections
+    and their weights. Genomes that hash the same play the same game.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    for key in sorted(genome.nodes):
+        ng = genome.nodes[key]
+        h.update(repr((key, ng.bias, ng.response, ng.activation,
+                       ng.aggregation)).encode())
+    for key in sorted(genome.connections):
+        cg = genome.connections[key]
+        if cg.enabled:
+            h.update(repr((key, cg.weight)).encode())
+
+    return h.hexdigest()
+
+
+class Fitness_cache(BaseReporter):
+    """
+    A class to house the fitness of played games, keyed by the genome's
+    hash, the game's seed and the board. The least recently used games are
+    dropped once the cache is full. With a path the cache is loaded from
+    it and, as a neat reporter, saved to it after each generation.
+    """
+
+    def __init__(self, max_size=100000, path=None):
+        self.max_size = max_size
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+        if path is not None and os.path.exists(path):
+            self.load()
+
+    def __len__(self):
+        return len(self.entries)
+
+    @staticmethod
+    def key(genome, seed, width, height):
+        """The key of a genome's game, or None if the game isn't seeded."""
+        if seed is None:
+            return None
+        return f"{genome_hash(genome)}:{seed}:{width}x{height}"
+
+    def get(self, key):
+        """The fitness of a game, or None if it hasn't been played."""
+        fitness = self.entries.get(key)
+        if fitness is None:
+            self.misses += 1
+            return None
+
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return fitness
+
+    def put(self, key, fitness):
+        """Remember the fitness of a game."""
+        self.entries[key] = fitness
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def load(self):
+        """Read the cache from its file."""
+        with open(self.path, "r") as file:
+            data = json.load(file)
+        if data.get("version") != CACHE_VERSION:
+            raise ValueError(f"Can't read fitness cache version "
+                             f"{data.get('version')!r} from {self.path}")
+
+        for key, fitness in data["entries"]:
+            self.put(key, fitness)
+
+    def save(self):
+        """Write the cache to its file, replacing the old one in one go."""
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as file:
+            json.dump({"version": CACHE_VERSION,
+                       "entries": list(self.entries.items())}, file)
+        os.replace(temp_path, self.path)
+
+    def end_generation(self, config, population, species_set):
+        if self.path is not None:
+            self.save()
@@ -0,0 +1,123 @@
+#!/usr/bin/env python3
+
+"""Headless game logic for training a generation of NEAT snakes."""
+
+from random import Random
+from time import perf_counter
+
+from snakes.Neat_snake import Neat_snake
+
+
+class Neat_engine:
+    """
+    A class to house the games of a generation. Every network plays its own
+    game and all of them are stepped together. Nothing is drawn here, a
+    viewer can watch the games by passing an observer to run. Pass a
+    Profiler to time the phases of each move.
+    """
+
+    def __init__(self, nets, width, height, seeds=None, profiler=None):
+        self.running = True
+        self.width = width
+        self.height = height
+        self.profiler = profiler
+
+        # Seed each game on its own so results don't depend on the others
+        if seeds is None:
+            seeds = [None for _ in nets]
+
+        self.nets = nets
+        self.den = [Neat_snake(width, height, Random(seed)) for seed in seeds]
+        self.fitness = [0 for _ in nets]
+
+    def on_loop(self):
+        """Move every living snake one step and score it."""
+        profiler = self.profiler
+
+        for x, snake in enumerate(self.den):
+            if snake.alive:
+                head_1 = snake.body[0]
+
+                # Move the snake
+                if profiler is None:
+                    snake.move_snake(self.nets[x])
+                    snake.update_body()
+                    lost = snake.check_lose_conditions()
+                else:
+                    lost = self.profile_move(snake, self.nets[x])
+
+                # Increase fitness if closer to food and decrease otherwise
+                if snake.calc_dist(head_1, snake.food) < snake.calc_dist(head_1, snake.food):
+                    self.fitness[x] += 1
+                else:
+                    self.fitness[x] -= 1.5
+
+                # Check if snake starves and decrease fitness if so
+                if snake.starved():
+                    self.kill(x)
+                    continue
+
+                # Check lose conditions
+                if lost:
+                    self.kill(x)
+                    continue
+
+                if snake.check_food_eaten():
+                    self.fitness[x] += 10
+                    snake.hunger = 0
+
+                # The snake filled the board so its game is over
+                if snake.won:
+                    snake.direction = (0, 0)
+                    snake.alive = False
+
+        # Check if all snakes are dead
+        if not any(snake.alive for snake in self.den):
+            self.running = False
+
+    def profile_move(self, snake, net):
+        """
+        Move a snake the same as on_loop, timing each phase. Returns whether
+        the snake lost.
+        """
+        profiler = self.profiler
+
+        start = perf_counter()
+        inputs = snake.get_input()
+        looked = perf_counter()
+        output = net.activate(inputs)
+        activated = perf_counter()
+        snake.turn(output)
+        snake.update_body()
+        moved = perf_counter()
+        lost = snake.check_lose_conditions()
+        checked = perf_counter()
+
+        profiler.add_time("get_input", looked - start)
+        profiler.add_time("activate", activated - looked)
+        profiler.add_time("update_body", moved - activated)
+        profiler.add_time("check_lose_conditions", checked - moved)
+        profiler.count("moves")
+        # The cells the rays crossed, plus the one each stopped on
+        profiler.count("ray_steps", sum(snake.rays[2]) + len(snake.rays[2]))
+
+        return lost
+
+    def kill(self, x):
+        """End the game of a snake and penalize it for dying short."""
+        snake = self.den[x]
+        snake.direction = (0, 0)
+        snake.alive = False
+        self.fitness[x] -= 100 / len(snake.body)
+
+    def run(self, observer=None):
+        """
+        Play until every snake is dead. The observer, if any, is called with
+        the engine after each step that leaves the games running.
+        """
+        while self.running:
+            self.on_loop()
+            if observer is not None and self.running:
+                observer(self)
+
+        return self.fitness
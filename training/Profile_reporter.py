@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+
+"""Report where the time of each generation goes."""
+
+from time import perf_counter
+from neat.reporting import BaseReporter
+
+
+class Profile_reporter(BaseReporter):
+    """
+    A neat reporter to go with StdOutReporter and StatisticsReporter. The
+    evaluation fills the profiler with its phases, the reporter adds the
+    evaluation as a whole and the reproduction and speciation after it,
+    then prints the generation's profile and keeps it in history.
+    """
+
+    def __init__(self, profiler, show=True):
+        self.profiler = profiler
+        self.show = show
+        self.history = []
+        self.generation = None
+        self.generation_start = None
+        self.evaluate_end = None
+
+    def start_generation(self, generation):
+        self.generation = generation
+        self.profiler.reset()
+        self.generation_start = perf_counter()
+
+    def post_evaluate(self, config, population, species, best_genome):
+        self.evaluate_end = perf_counter()
+        self.profiler.add_time("evaluate",
+                               self.evaluate_end - self.generation_start)
+
+    def end_generation(self, config, population, species_set):
+        end = perf_counter()
+        self.profiler.add_time("reproduce", end - self.evaluate_end)
+
+        profile = self.profiler.summary()
+        profile["generation"] = self.generation
+        profile["total"] = end - self.generation_start
+        self.history.append(profile)
+
+        if self.show:
+            self.print_profile(profile)
+
+    def print_profile(self, profile):
+        """Print the phases from slowest to fastest, then the counters."""
+        total = profile["total"]
+        print(f" ****** Profile of generation {profile['generation']} ****** \n")
+        for phase, seconds in sorted(profile["times"].items(),
+                                     key=lambda item: item[1], reverse=True):
+            share = seconds / total * 100 if total else 0
+            print(f"{phase:>22} {seconds:10.3f} sec {share:6.1f}%")
+        for counter, amount in sorted(profile["counts"].items()):
+            print(f"{counter:>22} {amount:10d}")
+        print()
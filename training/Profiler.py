@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+
+"""Timers and counters for the phases of training a generation."""
+
+from collections import defaultdict
+
+
+class Profiler:
+    """
+    A class to house the time spent in each phase of a generation and
+    counts of the work done, like ray steps walked. Code only records
+    into a profiler when handed one, so leaving it out costs a check of
+    None per step.
+    """
+
+    def __init__(self):
+        self.times = defaultdict(float)
+        self.counts = defaultdict(int)
+
+    def add_time(self, phase, seconds):
+        """Add time spent in a phase."""
+        self.times[phase] += seconds
+
+    def count(self, counter, amount=1):
+        """Add to a counter."""
+        self.counts[counter] += amount
+
+    def reset(self):
+        """Clear every timer and counter for the next generation."""
+        self.times.clear()
+        self.counts.clear()
+
+    def summary(self):
+        """The timers and counters as plain dicts."""
+        return {"times": dict(self.times), "counts": dict(self.counts)}
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+
+"""Keep a replay log of the best game of each generation."""
+
+import os
+import neat
+from neat.reporting import BaseReporter
+
+from snakes.Replay_log import REPLAY_SUFFIX, Replay_recorder
+from .Neat_engine import Neat_engine
+
+
+def play_logged(net, width, height, seed=None, keyframe_every=256):
+    """Play a headless game with a network and return its replay log."""
+    engine = Neat_engine([net], width, height, seeds=[seed])
+    snake = engine.den[0]
+    recorder = Replay_recorder(width, height, seed=seed, kind="neat",
+                               keyframe_every=keyframe_every)
+    recorder.observe(snake)
+    engine.run(observer=lambda engine: recorder.observe(snake))
+    # The observer isn't called after the last step
+    recorder.observe(snake)
+
+    return recorder.log()
+
+
+class Replay_keeper(BaseReporter):
+    """
+    A neat reporter to save the first game the best genome of a generation
+    played, every so many generations. Games are seeded by the run seed,
+    so playing it again gives the game the genome was scored on, and its
+    log is only a few bits a move.
+    """
+
+    def __init__(self, directory, run_seed, width, height, every=1):
+        self.directory = directory
+        self.run_seed = run_seed
+        self.width = width
+        self.height = height
+        self.every = every
+        self.generation = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def start_generation(self, generation):
+        self.generation = generation
+
+    def post_evaluate(self, config, population, species, best_genome):
+        if self.generation % self.every:
+            return
+
+        seed = self.run_seed.game_seeds([(best_genome.key, best_genome)])[0]
+        net = neat.nn.feed_forward.FeedForwardNetwork.create(best_genome,
+                                                             config)
+        log = play_logged(net, self.width, self.height, seed=seed)
+        log.save(os.path.join(self.directory,
+                              f"generation_{self.generation:05d}{REPLAY_SUFFIX}"))